@@ -1,25 +1,148 @@
 import os
+import io
+import sys
+import json
+import atexit
+import shutil
+import signal
 import tempfile
+import itertools
+import threading
+import traceback
 import subprocess
+import contextlib
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib.metadata import distributions
 from typing import Dict, Any, List, Optional
 from agents import function_tool
+from utils import fast_json
 
-@function_tool
-def execute_python_code(code: str) -> Dict[str, Any]:
+# Code runs in-process by default; set CODE_TOOL_ISOLATION=subprocess to run
+# every snippet in a fresh interpreter instead
+_ISOLATION_MODE = os.environ.get("CODE_TOOL_ISOLATION", "inprocess")
+_TIMEOUT_SECONDS = 60
+_PACKAGES_TTL_SECONDS = 60
+
+# Code should assign its outputs to __result__; until all callers do, the
+# namespace is still scanned for serializable variables when it is missing
+_LEGACY_OUTPUT_SCAN = os.environ.get("CODE_TOOL_LEGACY_OUTPUTS", "1") == "1"
+
+# Subprocess jobs get numbered directories under one per-process scratch
+# directory; removing them happens off the request path
+_job_counter = itertools.count()
+_cleanup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="code_tool_cleanup")
+
+class _ExecutionTimeout(BaseException):
     """
-    Execute Python code and return the result.
+    Raised inside user code when the execution time limit is reached.
     
-    Args:
-        code: Python code to execute
-        
-    Returns:
-        Dictionary containing the execution result
+    Derives from BaseException so a broad "except Exception" in the user code cannot swallow it.
     """
-    # 使用空字典作为默认输入
-    inputs = {}
+
+def _alarm_available() -> bool:
+    """SIGALRM can only be installed from the main thread, and not at all on some platforms"""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+def _raise_timeout(signum, frame):
+    raise _ExecutionTimeout()
+
+@functools.lru_cache(maxsize=1)
+def _scratch_dir() -> str:
+    """Create the scratch directory on first use and remove it at exit"""
+    scratch_dir = tempfile.mkdtemp(prefix="va_")
+    atexit.register(shutil.rmtree, scratch_dir, ignore_errors=True)
+    return scratch_dir
+
+@functools.lru_cache(maxsize=128)
+def _compile_code(code: str):
+    """Compile user code once; repeated snippets skip parsing"""
+    return compile(code, "<user>", "exec")
+
+def _collect_outputs(namespace: Dict[str, Any], inputs: Dict[str, Any]) -> Any:
+    """Return __result__, or the JSON-serializable, non-callable, non-private variables"""
+    if "__result__" in namespace:
+        outputs = namespace["__result__"]
+        try:
+            json.dumps(outputs)
+        except (TypeError, ValueError, OverflowError):
+            return {"error": "__result__ is not JSON-serializable"}
+        return outputs
+    
+    outputs = {}
+    if not _LEGACY_OUTPUT_SCAN:
+        return outputs
+    for key, value in namespace.items():
+        if (not key.startswith("__") and
+            not callable(value) and
+            not key in inputs and
+            not key == "inputs"):
+            try:
+                json.dumps({key: value})
+                outputs[key] = value
+            except (TypeError, ValueError, OverflowError):
+                pass
+    return outputs
+
+def _run_in_process(code: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run code in this interpreter with a fresh namespace and captured output; needs _alarm_available()"""
+    namespace = inputs.copy()
+    namespace["__name__"] = "__main__"
+    stdout, stderr = io.StringIO(), io.StringIO()
     
-    # Create a temporary directory for code execution
-    temp_dir = tempfile.mkdtemp()
+    # Match the subprocess wrapper: cwd is importable, and a chdir in the code does not outlive it
+    cwd = os.getcwd()
+    add_cwd = cwd not in sys.path
+    if add_cwd:
+        sys.path.insert(0, cwd)
+    previous_handler = signal.signal(signal.SIGALRM, _raise_timeout)
+    
+    try:
+        signal.setitimer(signal.ITIMER_REAL, _TIMEOUT_SECONDS)
+        try:
+            compiled = _compile_code(code)
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    exec(compiled, namespace)
+                except SystemExit as e:
+                    if e.code not in (None, 0):
+                        raise
+        finally:
+            # Disarmed before leaving the try, so a late alarm is still reported as a timeout
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _ExecutionTimeout:
+        return {
+            "status": "error",
+            "message": f"Code execution timed out after {_TIMEOUT_SECONDS} seconds"
+        }
+    except (Exception, SystemExit):
+        stderr.write(traceback.format_exc())
+        return {
+            "status": "error",
+            "message": f"Code execution failed: {stderr.getvalue()}",
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue()
+        }
+    finally:
+        signal.signal(signal.SIGALRM, previous_handler)
+        os.chdir(cwd)
+        if add_cwd and cwd in sys.path:
+            sys.path.remove(cwd)
+    
+    return {
+        "status": "success",
+        "message": "Code executed successfully",
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+        "outputs": _collect_outputs(namespace, inputs)
+    }
+
+def _run_in_subprocess(code: str, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Run code in a fresh Python interpreter (opt-in isolation mode)"""
+    # Create a job directory for code execution
+    temp_dir = os.path.join(_scratch_dir(), f"job_{next(_job_counter)}")
+    os.mkdir(temp_dir)
     script_path = os.path.join(temp_dir, "script.py")
     
     # Write the code to a temporary file
@@ -28,9 +151,8 @@ def execute_python_code(code: str) -> Dict[str, Any]:
     
     # Write inputs to a JSON file
     inputs_path = os.path.join(temp_dir, "inputs.json")
-    with open(inputs_path, "w") as f:
-        import json
-        json.dump(inputs, f)
+    with open(inputs_path, "wb") as f:
+        f.write(fast_json.dumps(inputs))
 
     # Create a wrapper script that loads inputs and executes the code
     wrapper_path = os.path.join(temp_dir, "wrapper.py")
@@ -57,21 +179,24 @@ script_path = os.path.join(script_dir, "script.py")
 with open(script_path, "r") as script_file:
     exec(script_file.read(), namespace)
 
-# Save outputs
+# Save outputs: __result__ if the code set it, otherwise scan the namespace
 outputs = {}
-for key, value in namespace.items():
-    # Only include non-function, non-module, non-private variables
-    if (not key.startswith("__") and 
-        not callable(value) and 
-        not key in inputs and
-        not key == "inputs"):
-        try:
-            # Try to serialize the value to JSON
-            json.dumps({key: value})
-            outputs[key] = value
-        except (TypeError, OverflowError):
-            # Skip values that can't be serialized
-            pass
+if "__result__" in namespace:
+    outputs = namespace["__result__"]
+elif os.environ.get("CODE_TOOL_LEGACY_OUTPUTS", "1") == "1":
+    for key, value in namespace.items():
+        # Only include non-function, non-module, non-private variables
+        if (not key.startswith("__") and 
+            not callable(value) and 
+            not key in inputs and
+            not key == "inputs"):
+            try:
+                # Try to serialize the value to JSON
+                json.dumps({key: value})
+                outputs[key] = value
+            except (TypeError, OverflowError):
+                # Skip values that can't be serialized
+                pass
 
 outputs_path = os.path.join(script_dir, "outputs.json")
 with open(outputs_path, "w") as f:
@@ -85,7 +210,7 @@ with open(outputs_path, "w") as f:
             cwd=os.getcwd(),  # 使用当前工作目录
             capture_output=True,
             text=True,
-            timeout=60  # Timeout after 60 seconds
+            timeout=_TIMEOUT_SECONDS
         )
         
         # Check for errors
@@ -100,9 +225,8 @@ with open(outputs_path, "w") as f:
         # Load outputs
         outputs_path = os.path.join(temp_dir, "outputs.json")
         if os.path.exists(outputs_path):
-            with open(outputs_path, "r") as f:
-                import json
-                outputs = json.load(f)
+            with open(outputs_path, "rb") as f:
+                outputs = fast_json.loads(f.read())
         else:
             outputs = {}
         
@@ -116,7 +240,7 @@ with open(outputs_path, "w") as f:
     except subprocess.TimeoutExpired:
         return {
             "status": "error",
-            "message": "Code execution timed out after 60 seconds"
+            "message": f"Code execution timed out after {_TIMEOUT_SECONDS} seconds"
         }
     except Exception as e:
         return {
@@ -124,9 +248,35 @@ with open(outputs_path, "w") as f:
             "message": f"Error executing code: {str(e)}"
         }
     finally:
-        # Clean up temporary files
-        import shutil
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        # Clean up temporary files in the background
+        _cleanup_executor.submit(shutil.rmtree, temp_dir, ignore_errors=True)
+
+@function_tool
+def execute_python_code(code: str) -> Dict[str, Any]:
+    """
+    Execute Python code and return the result.
+    
+    Assign a JSON-serializable value (usually a dict) to __result__ to return it
+    as the "outputs" of the call.
+    
+    Args:
+        code: Python code to execute
+        
+    Returns:
+        Dictionary containing the execution result
+    """
+    # 使用空字典作为默认输入
+    inputs = {}
+    
+    # Without SIGALRM in-process code could not be stopped, so it runs in a subprocess with a timeout instead
+    if _ISOLATION_MODE == "subprocess" or not _alarm_available():
+        return _run_in_subprocess(code, inputs)
+    return _run_in_process(code, inputs)
+
+@functools.lru_cache(maxsize=1)
+def _list_packages(ttl_bucket: int) -> List[str]:
+    """List distribution names; cached until the TTL bucket changes"""
+    return [dist.metadata["Name"] for dist in distributions()]
 
 @function_tool
 def get_installed_packages() -> List[str]:
@@ -137,17 +287,6 @@ def get_installed_packages() -> List[str]:
         List of installed package names
     """
     try:
-        process = subprocess.run(
-            ["pip", "list", "--format=json"],
-            capture_output=True,
-            text=True
-        )
-        
-        if process.returncode != 0:
-            return []
-        
-        import json
-        packages = json.loads(process.stdout)
-        return [package["name"] for package in packages]
+        return list(_list_packages(int(time.monotonic() // _PACKAGES_TTL_SECONDS)))
     except Exception:
-        return []
\ No newline at end of file
+        return []
@@ -1,9 +1,8 @@
 import os
-import json
 from typing import Dict, List, Optional, Any
 from agents import function_tool
 
-
+_VIDEO_EXTENSIONS = frozenset({".mp4", ".avi", ".mov", ".mkv"})
 
 @function_tool
 def list_available_videos(video_dir: str) -> List[str]:
@@ -14,23 +13,18 @@ def list_available_videos(video_dir: str) -> List[str]:
     if not os.path.exists(video_dir):
         return []
     
-    videos = [f for f in os.listdir(video_dir) 
-             if f.endswith(('.mp4', '.avi', '.mov', '.mkv'))]
+    with os.scandir(video_dir) as entries:
+        videos = [entry.name for entry in entries
+                  if not entry.name.startswith(".") and
+                  os.path.splitext(entry.name)[1].lower() in _VIDEO_EXTENSIONS and
+                  entry.is_file()]
     return videos
 
-@function_tool
-def get_video_info(video_name: str, video_dir: str) -> Dict[str, Any]:
-    """Get information about a specific video"""
-    if video_dir is None:
-        video_dir = os.path.join(os.getcwd(), "videos")
-        
-    video_path = os.path.join(video_dir, video_name)
-    if not os.path.exists(video_path):
-        return {"error": f"Video {video_name} not found"}
-    
+def _video_info(video_name: str, video_path: str, stat_result: os.stat_result) -> Dict[str, Any]:
+    """Build the info dictionary for a video from its stat result"""
     # In a real implementation, we would use a library like ffprobe to get video metadata
     # For now, we'll return some basic info
-    file_size = os.path.getsize(video_path) / (1024 * 1024)  # Size in MB
+    file_size = stat_result.st_size / (1024 * 1024)  # Size in MB
     return {
         "name": video_name,
         "path": video_path,
@@ -38,4 +32,34 @@ def get_video_info(video_name: str, video_dir: str) -> Dict[str, Any]:
         "exists": True
     }
 
+@function_tool
+def get_video_info(video_name: str, video_dir: str) -> Dict[str, Any]:
+    """Get information about a specific video"""
+    if video_dir is None:
+        video_dir = os.path.join(os.getcwd(), "videos")
+        
+    video_path = os.path.join(video_dir, video_name)
+    try:
+        stat_result = os.stat(video_path)
+    except FileNotFoundError:
+        return {"error": f"Video {video_name} not found"}
+    
+    return _video_info(video_name, video_path, stat_result)
 
+@function_tool
+def get_video_info_batch(video_names: List[str], video_dir: str) -> List[Dict[str, Any]]:
+    """Get information about several videos in the video directory at once"""
+    if video_dir is None:
+        video_dir = os.path.join(os.getcwd(), "videos")
+    
+    wanted = set(video_names)
+    entries_by_name = {}
+    if os.path.exists(video_dir):
+        with os.scandir(video_dir) as entries:
+            entries_by_name = {entry.name: entry for entry in entries if entry.name in wanted}
+    
+    return [
+        _video_info(name, entries_by_name[name].path, entries_by_name[name].stat())
+        if name in entries_by_name else {"error": f"Video {name} not found"}
+        for name in video_names
+    ]
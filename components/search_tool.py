@@ -1,15 +1,51 @@
-import os
-import requests
-import urllib.parse
-import tempfile
-import subprocess
-import json
+import asyncio
+import functools
 import re
+import threading
 from typing import Dict, Any, Optional, List
 from agents import function_tool
 
+try:
+    from yt_dlp import YoutubeDL
+    from yt_dlp.utils import DownloadError
+except ImportError:  # reported by the tools at call time
+    YoutubeDL = None
+    DownloadError = Exception
+
+_YT_RE = re.compile(r'(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})')
+
+# The shared YoutubeDL instances are not safe to use from several threads at once
+_YDL_LOCK = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def _get_ydl(flat: bool) -> Optional["YoutubeDL"]:
+    """
+    Return a shared YoutubeDL instance, or None if yt-dlp is not installed.
+    
+    Args:
+        flat: Whether playlist/search entries should be listed without resolving each video
+    """
+    if YoutubeDL is None:
+        return None
+    
+    options = {
+        "quiet": True,
+        "no_warnings": True,
+        "skip_download": True
+    }
+    if flat:
+        options["extract_flat"] = "in_playlist"
+    else:
+        options["noplaylist"] = True
+    return YoutubeDL(options)
+
+def _extract_info(ydl: "YoutubeDL", url: str) -> Dict[str, Any]:
+    """Look up metadata without downloading; run via asyncio.to_thread to keep the event loop free"""
+    with _YDL_LOCK:
+        return ydl.extract_info(url, download=False)
+
 @function_tool
-def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
+async def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
     """
     Search for videos on YouTube related to the query.
     
@@ -22,9 +58,8 @@ def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
     """
     try:
         # Check if yt-dlp is installed
-        try:
-            subprocess.run(["yt-dlp", "--version"], check=True, capture_output=True)
-        except (subprocess.SubprocessError, FileNotFoundError):
+        ydl = _get_ydl(flat=True)
+        if ydl is None:
             return [{
                 "status": "error",
                 "message": "yt-dlp is not installed. Please install it with 'pip install yt-dlp'"
@@ -32,23 +67,14 @@ def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
         
         # Use yt-dlp to search for videos
         search_query = f"ytsearch{max_results}:{query}"
-        cmd = [
-            "yt-dlp",
-            "--flat-playlist",
-            "--dump-json",
-            search_query
-        ]
-        
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        result = await asyncio.to_thread(_extract_info, ydl, search_query)
         
-        # Parse the JSON output (one JSON object per line)
         videos = []
-        for line in result.stdout.strip().split('\n'):
-            if line:
-                video_info = json.loads(line)
+        for video_info in result.get("entries") or []:
+            if video_info:
                 videos.append({
                     "title": video_info.get("title", "Unknown title"),
-                    "url": video_info.get("webpage_url", ""),
+                    "url": video_info.get("webpage_url") or video_info.get("url", ""),
                     "id": video_info.get("id", ""),
                     "duration": video_info.get("duration", 0),
                     "uploader": video_info.get("uploader", "Unknown uploader"),
@@ -57,10 +83,10 @@ def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
                 })
         
         return videos
-    except subprocess.CalledProcessError as e:
+    except DownloadError as e:
         return [{
             "status": "error",
-            "message": f"Failed to search videos: {e.stderr}",
+            "message": f"Failed to search videos: {e}",
             "error": str(e)
         }]
     except Exception as e:
@@ -71,7 +97,7 @@ def search_youtube_videos(query: str, max_results: int) -> List[Dict[str, Any]]:
         }]
 
 @function_tool
-def verify_video_url(video_url: str) -> Dict[str, Any]:
+async def verify_video_url(video_url: str) -> Dict[str, Any]:
     """
     Verify if a video URL is valid and accessible.
     
@@ -83,9 +109,8 @@ def verify_video_url(video_url: str) -> Dict[str, Any]:
     """
     try:
         # Check if yt-dlp is installed
-        try:
-            subprocess.run(["yt-dlp", "--version"], check=True, capture_output=True)
-        except (subprocess.SubprocessError, FileNotFoundError):
+        ydl = _get_ydl(flat=False)
+        if ydl is None:
             return {
                 "status": "error",
                 "message": "yt-dlp is not installed. Please install it with 'pip install yt-dlp'",
@@ -94,28 +119,22 @@ def verify_video_url(video_url: str) -> Dict[str, Any]:
         
         # Extract video ID from URL if it's a YouTube URL
         youtube_id = None
-        youtube_pattern = r'(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})'
-        match = re.search(youtube_pattern, video_url)
+        match = _YT_RE.search(video_url)
         if match:
             youtube_id = match.group(1)
         
-        # Check if video exists (for YouTube videos)
-        if youtube_id:
-            check_cmd = ["yt-dlp", "--skip-download", "--playlist-items", "1", f"https://www.youtube.com/watch?v={youtube_id}"]
-            try:
-                subprocess.run(check_cmd, check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError:
+        # Get video info; a failed lookup means the video is unavailable
+        try:
+            video_info = await asyncio.to_thread(_extract_info, ydl, video_url)
+        except DownloadError:
+            if youtube_id:
                 return {
                     "status": "error",
                     "message": f"Video unavailable or has been removed: {video_url}",
                     "error": "Video unavailable",
                     "video_id": youtube_id
                 }
-        
-        # Get video info
-        info_cmd = ["yt-dlp", "--dump-json", video_url]
-        info_result = subprocess.run(info_cmd, check=True, capture_output=True, text=True)
-        video_info = json.loads(info_result.stdout)
+            raise
         
         return {
             "status": "success",
@@ -127,12 +146,12 @@ def verify_video_url(video_url: str) -> Dict[str, Any]:
             "view_count": video_info.get("view_count", 0),
             "description": video_info.get("description", "")
         }
-    except subprocess.CalledProcessError as e:
+    except DownloadError as e:
         return {
             "status": "error",
-            "message": f"Failed to verify video: {e.stderr}",
+            "message": f"Failed to verify video: {e}",
             "error": str(e),
-            "command_output": e.stderr
+            "command_output": str(e)
         }
     except Exception as e:
         return {
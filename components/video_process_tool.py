@@ -1,16 +1,249 @@
 import os
-import requests
-import urllib.parse
-import tempfile
+import asyncio
 import subprocess
-import json
 import re
 import glob
-from typing import Dict, Any, Optional, List
+import functools
+from typing import Dict, Any, Optional, List, Tuple
 from agents import function_tool
+from utils import fast_json
+
+try:
+    import av
+except ImportError:  # metadata is read with ffprobe instead
+    av = None
+
+_SEQUENCE_RE = re.compile(r'^(.*?)(\d+)(\.[A-Za-z0-9]+)$')
+_TS_RE = re.compile(r'(\d+)s\.')
+_HW_H264_ENCODERS = ("h264_videotoolbox", "h264_nvenc", "h264_vaapi")
+
+# Frame extraction runs one ffmpeg per group of timestamps, with the groups
+# decoded concurrently
+_FRAMES_PER_PROCESS = 4
+_MAX_CONCURRENT_FFMPEG = os.cpu_count() or 4
+
+async def _run_command(cmd: List[str], input: Optional[bytes] = None) -> bytes:
+    """
+    Run a command without blocking the event loop.
+    
+    Args:
+        cmd: Command and arguments to execute
+        input: Optional bytes to feed to the command's standard input
+        
+    Returns:
+        The command's raw standard output
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.PIPE if input is not None else None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate(input)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return stdout
+
+@functools.lru_cache(maxsize=1)
+def detect_h264_encoder() -> str:
+    """
+    Pick a hardware H.264 encoder that works on this machine, once per process.
+    
+    ffmpeg builds list encoders whose hardware or drivers are missing, so each
+    listed candidate is test-encoded before it is chosen.
+    
+    Returns:
+        Name of the encoder to pass to -c:v, "libx264" if no hardware encoder works
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            check=True, capture_output=True, text=True, timeout=10
+        )
+    except (subprocess.SubprocessError, OSError):
+        return "libx264"
+    
+    for encoder in _HW_H264_ENCODERS:
+        if encoder not in result.stdout:
+            continue
+        test_cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-v", "error",
+            "-f", "lavfi",
+            "-i", "color=c=black:s=256x256:d=0.2",
+            "-c:v", encoder,
+            "-pix_fmt", "yuv420p",
+            "-f", "null",
+            "-"
+        ]
+        try:
+            if subprocess.run(test_cmd, capture_output=True, timeout=10).returncode == 0:
+                return encoder
+        except (subprocess.SubprocessError, OSError):
+            continue
+    return "libx264"
+
+def _probe_stream_with_av(media_path: str, stream_selector: str) -> Dict[str, Any]:
+    """
+    Read stream and container metadata in-process with PyAV.
+    
+    Args:
+        media_path: Path to the media file
+        stream_selector: "v:0" for the first video stream or "a:0" for the first audio stream
+        
+    Returns:
+        Dictionary with the same fields ffprobe would report for the stream
+    """
+    with av.open(media_path) as container:
+        streams = container.streams.video if stream_selector.startswith("v") else container.streams.audio
+        if not streams:
+            return {}
+        
+        stream = streams[0]
+        codec_context = stream.codec_context
+        stream_info = {}
+        if stream.duration is not None and stream.time_base is not None:
+            stream_info["duration"] = float(stream.duration * stream.time_base)
+        elif container.duration is not None:
+            stream_info["duration"] = container.duration / av.time_base
+        if stream.frames:
+            stream_info["nb_frames"] = stream.frames
+        if stream.type == "video":
+            stream_info["width"] = codec_context.width
+            stream_info["height"] = codec_context.height
+        else:
+            stream_info["sample_rate"] = codec_context.sample_rate
+            stream_info["channels"] = codec_context.channels
+        return stream_info
+
+def _encode_frames_with_av(frames: List[str], output_path: str, fps: int, duration_per_frame: int, encoder: str) -> None:
+    """
+    Encode still frames into a video in-process with PyAV, skipping the ffmpeg
+    process start-up and codec initialisation of a CLI run.
+    
+    Args:
+        frames: Sorted list of frame paths
+        output_path: Path to save the output video
+        fps: Frames per second for the output video
+        duration_per_frame: Duration in seconds to show each frame
+        encoder: Name of the H.264 encoder to use
+    """
+    with av.open(frames[0]) as first_image:
+        first_frame = next(first_image.decode(video=0))
+        # yuv420p needs even dimensions
+        width = first_frame.width - first_frame.width % 2
+        height = first_frame.height - first_frame.height % 2
+    
+    with av.open(output_path, "w") as container:
+        stream = container.add_stream(encoder, rate=fps)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = "yuv420p"
+        
+        pts = 0
+        for frame_path in frames:
+            with av.open(frame_path) as image:
+                picture = next(image.decode(video=0)).reformat(width=width, height=height, format="yuv420p")
+            for _ in range(max(1, int(duration_per_frame * fps))):
+                picture.pts = pts
+                for packet in stream.encode(picture):
+                    container.mux(packet)
+                pts += 1
+        
+        # Flush the encoder
+        for packet in stream.encode():
+            container.mux(packet)
+
+async def probe_stream(media_path: str, stream_selector: str, stream_entries: str) -> Dict[str, Any]:
+    """
+    Read stream and container metadata, in-process with PyAV when it is
+    installed and otherwise with a single ffprobe call.
+    
+    Args:
+        media_path: Path to the media file
+        stream_selector: ffprobe stream specifier, e.g. "v:0" or "a:0"
+        stream_entries: Comma-separated stream fields to read
+        
+    Returns:
+        Dictionary of stream fields; the container duration is used when the stream has none
+    """
+    if av is not None:
+        try:
+            return _probe_stream_with_av(media_path, stream_selector)
+        except Exception:
+            pass  # Fall back to ffprobe for anything PyAV cannot open
+    
+    info_cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", stream_selector,
+        "-show_entries", f"stream={stream_entries}:format=duration",
+        "-of", "json",
+        media_path
+    ]
+    
+    info_json = fast_json.loads(await _run_command(info_cmd))
+    stream_info = dict((info_json.get("streams") or [{}])[0])
+    if "duration" not in stream_info and "duration" in info_json.get("format", {}):
+        stream_info["duration"] = info_json["format"]["duration"]
+    return stream_info
+
+def _image_sequence_pattern(frames: List[str]) -> Optional[Tuple[str, int]]:
+    """
+    Detect frames named as a plain numbered sequence (frame_01.jpg, frame_02.jpg, ...).
+    
+    Args:
+        frames: Sorted list of frame paths
+        
+    Returns:
+        Tuple of (printf-style pattern for the image2 demuxer, start number), or None
+    """
+    matches = [_SEQUENCE_RE.match(os.path.basename(frame)) for frame in frames]
+    if not all(matches):
+        return None
+    
+    prefix, digits, extension = matches[0].groups()
+    start_number = int(digits)
+    for offset, match in enumerate(matches):
+        if (match.group(1) != prefix or
+            match.group(3) != extension or
+            len(match.group(2)) != len(digits) or
+            int(match.group(2)) != start_number + offset):
+            return None
+    
+    frames_dir = os.path.dirname(frames[0]).replace("%", "%%")
+    pattern = os.path.join(frames_dir, f"{prefix.replace('%', '%%')}%0{len(digits)}d{extension}")
+    return pattern, start_number
+
+def _frame_extraction_cmd(video_path: str, timestamp_seconds: List[int], output_files: List[str]) -> List[str]:
+    """
+    Build one ffmpeg command that writes a frame per timestamp: every
+    timestamp is opened as its own fast-seeked input and mapped to its own output.
+    
+    Args:
+        video_path: Path to the video file
+        timestamp_seconds: Timestamps in seconds
+        output_files: Output image path for each timestamp
+        
+    Returns:
+        The ffmpeg command
+    """
+    cmd = ["ffmpeg", "-y"]
+    for seconds in timestamp_seconds:
+        cmd += ["-ss", str(seconds), "-i", video_path]
+    for i, output_file in enumerate(output_files):
+        cmd += [
+            "-map", f"{i}:v:0",
+            "-frames:v", "1",
+            "-q:v", "2",
+            output_file
+        ]
+    return cmd
+
 # Add function for extracting video frames
 @function_tool
-def extract_video_frames(video_path: str, timestamps: List[str], output_dir: Optional[str]) -> Dict[str, Any]:
+async def extract_video_frames(video_path: str, timestamps: List[str], output_dir: Optional[str]) -> Dict[str, Any]:
     """
     Extract frames from a video at specific timestamps.
     
@@ -42,23 +275,27 @@ def extract_video_frames(video_path: str, timestamps: List[str], output_dir: Opt
                 # Handle case where timestamp might be in seconds only
                 timestamp_seconds.append(int(ts))
         
-        # Extract frames using ffmpeg
+        output_files = [
+            os.path.join(output_dir, f"frame_{i+1:02d}_{seconds}s.jpg")
+            for i, seconds in enumerate(timestamp_seconds)
+        ]
+        
+        # Extract frames in groups, each group with a single ffmpeg process
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FFMPEG)
+        
+        async def extract_group(start: int) -> None:
+            end = start + _FRAMES_PER_PROCESS
+            async with semaphore:
+                await _run_command(_frame_extraction_cmd(
+                    video_path, timestamp_seconds[start:end], output_files[start:end]
+                ))
+        
+        await asyncio.gather(*(
+            extract_group(start) for start in range(0, len(output_files), _FRAMES_PER_PROCESS)
+        ))
+        
         extracted_frames = []
-        for i, seconds in enumerate(timestamp_seconds):
-            output_file = os.path.join(output_dir, f"frame_{i+1:02d}_{seconds}s.jpg")
-            
-            cmd = [
-                "ffmpeg",
-                "-ss", str(seconds),
-                "-i", video_path,
-                "-vframes", "1",
-                "-q:v", "2",
-                output_file,
-                "-y"
-            ]
-            
-            subprocess.run(cmd, check=True, capture_output=True)
-            
+        for i, (seconds, output_file) in enumerate(zip(timestamp_seconds, output_files)):
             if os.path.exists(output_file):
                 extracted_frames.append({
                     "timestamp": timestamps[i],
@@ -80,6 +317,12 @@ def extract_video_frames(video_path: str, timestamps: List[str], output_dir: Opt
             "frames_dir": output_dir if 'output_dir' in locals() else None
         }
 
+@functools.lru_cache(maxsize=128)
+def _load_transcript(json_path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a transcript file; the stat fields key the cache so edits are picked up"""
+    with open(json_path, 'rb') as f:
+        return fast_json.loads(f.read())
+
 @function_tool
 def read_transcript_json(json_path: str) -> Dict[str, Any]:
     """
@@ -92,21 +335,21 @@ def read_transcript_json(json_path: str) -> Dict[str, Any]:
         Dictionary with transcript data
     """
     try:
-        if not os.path.exists(json_path):
+        try:
+            stat = os.stat(json_path)
+            transcript_data = _load_transcript(json_path, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
             return {
                 "status": "error",
                 "message": f"File not found: {json_path}"
             }
         
-        with open(json_path, 'r', encoding='utf-8') as f:
-            transcript_data = json.load(f)
-        
         return {
             "status": "success",
             "transcript_data": transcript_data
         }
     
-    except json.JSONDecodeError:
+    except fast_json.JSONDecodeError:
         return {
             "status": "error",
             "message": f"Invalid JSON file: {json_path}"
@@ -118,7 +361,7 @@ def read_transcript_json(json_path: str) -> Dict[str, Any]:
         }
 
 @function_tool
-def create_video_from_frames(
+async def create_video_from_frames(
     frames_dir: str,
     output_path: Optional[str],
     fps: int,
@@ -156,37 +399,43 @@ def create_video_from_frames(
         if add_transitions is None:
             add_transitions = True
         
-        # Check if frames directory exists
-        if not os.path.exists(frames_dir):
-            return {
-                "status": "error",
-                "message": f"Frames directory not found: {frames_dir}"
-            }
-        
         # Get list of frames
         frames = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")))
         if not frames:
             frames = sorted(glob.glob(os.path.join(frames_dir, "*.png")))
         
         if not frames:
+            # Only an empty result needs to know whether the directory exists
+            if not os.path.isdir(frames_dir):
+                return {
+                    "status": "error",
+                    "message": f"Frames directory not found: {frames_dir}"
+                }
             return {
                 "status": "error",
                 "message": f"No frames found in directory: {frames_dir}"
             }
         
-        # Create a temporary directory for the ffmpeg script
-        temp_dir = tempfile.mkdtemp()
-        script_path = os.path.join(temp_dir, "ffmpeg_script.txt")
-        
         # Calculate total duration
         total_frames = len(frames)
         total_duration = total_frames * duration_per_frame
         
-        # Create ffmpeg script
-        with open(script_path, "w") as f:
+        # Regularly numbered frames are read directly by the image2 demuxer;
+        # anything else gets a concat manifest piped through stdin
+        manifest = None
+        sequence = _image_sequence_pattern(frames)
+        if sequence:
+            pattern, start_number = sequence
+            input_args = [
+                "-framerate", f"1/{duration_per_frame}",
+                "-start_number", str(start_number),
+                "-i", pattern
+            ]
+        else:
+            manifest_lines = []
             for i, frame in enumerate(frames):
                 # Extract timestamp from filename if available
-                timestamp_match = re.search(r'(\d+)s\.', os.path.basename(frame))
+                timestamp_match = _TS_RE.search(os.path.basename(frame))
                 timestamp = timestamp_match.group(1) if timestamp_match else str(i)
                 
                 # Get text overlay for this frame
@@ -198,103 +447,89 @@ def create_video_from_frames(
                 start_time = i * duration_per_frame
                 end_time = (i + 1) * duration_per_frame
                 
+                # Paths must be absolute since the manifest has no directory of its own,
+                # and quotes are closed, escaped and reopened inside the quoted path
+                frame_path = os.path.abspath(frame).replace("'", "'\\''")
+                
                 # Add frame to script with fade in/out if transitions are enabled
                 if add_transitions:
                     fade_duration = min(0.5, duration_per_frame / 4)
-                    f.write(f"file '{frame}'\n")
-                    f.write(f"duration {duration_per_frame}\n")
+                    manifest_lines.append(f"file '{frame_path}'")
+                    manifest_lines.append(f"duration {duration_per_frame}")
                     if i < total_frames - 1:  # Don't add outpoint for last frame
-                        f.write(f"outpoint {end_time}\n")
+                        manifest_lines.append(f"outpoint {end_time}")
                 else:
-                    f.write(f"file '{frame}'\n")
-                    f.write(f"duration {duration_per_frame}\n")
-        
-        # Create video using ffmpeg
-        cmd = [
-            "ffmpeg",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", script_path,
-            "-c:v", "libx264",
-            "-pix_fmt", "yuv420p",
-            "-r", str(fps),
-            "-vf", "fps=25",  # Force 25fps for smooth playback
-            output_path,
-            "-y"  # Overwrite existing file
-        ]
-        
-        subprocess.run(cmd, check=True, capture_output=True)
-        
-        # Add text overlays if provided
-        if text_overlays:
-            temp_output = os.path.join(temp_dir, "temp_output.mp4")
+                    manifest_lines.append(f"file '{frame_path}'")
+                    manifest_lines.append(f"duration {duration_per_frame}")
             
-            # Create filter complex for text overlays
-            filter_complex = []
-            for i, overlay in enumerate(text_overlays):
-                if i >= total_frames:
-                    break
-                    
-                text = overlay.get("text", "")
-                if not text:
-                    continue
-                    
-                start_time = i * duration_per_frame
-                end_time = (i + 1) * duration_per_frame
+            manifest = ("\n".join(manifest_lines) + "\n").encode("utf-8")
+            input_args = [
+                "-f", "concat",
+                "-safe", "0",
+                "-protocol_whitelist", "file,pipe",
+                "-i", "pipe:0"
+            ]
+        
+        # Create filter complex for text overlays so they are drawn during
+        # the same encode instead of a second pass over the output
+        filter_complex = ["fps=25"]  # Force 25fps for smooth playback
+        for i, overlay in enumerate(text_overlays or []):
+            if i >= total_frames:
+                break
                 
-                # Escape special characters
-                text = text.replace("'", "\\'").replace(":", "\\:")
+            text = overlay.get("text", "")
+            if not text:
+                continue
                 
-                # Add text overlay
-                filter_complex.append(
-                    f"drawtext=text='{text}':fontcolor=white:fontsize=24:box=1:boxcolor=black@0.5:"
-                    f"boxborderw=5:x=(w-text_w)/2:y=h-text_h-20:enable='between(t,{start_time},{end_time})'"
-                )
+            start_time = i * duration_per_frame
+            end_time = (i + 1) * duration_per_frame
             
-            if filter_complex:
-                # Apply text overlays
-                text_cmd = [
-                    "ffmpeg",
-                    "-i", output_path,
-                    "-vf", ",".join(filter_complex),
-                    "-c:v", "libx264",
-                    "-pix_fmt", "yuv420p",
-                    temp_output,
-                    "-y"
-                ]
-                
-                subprocess.run(text_cmd, check=True, capture_output=True)
-                
-                # Replace original output with the one with text overlays
-                os.replace(temp_output, output_path)
+            # Escape special characters
+            text = text.replace("'", "\\'").replace(":", "\\:")
+            
+            # Add text overlay
+            filter_complex.append(
+                f"drawtext=text='{text}':fontcolor=white:fontsize=24:box=1:boxcolor=black@0.5:"
+                f"boxborderw=5:x=(w-text_w)/2:y=h-text_h-20:enable='between(t,{start_time},{end_time})'"
+            )
+        
+        # Create video using ffmpeg, on a hardware encoder when one is available
+        video_encoder = await asyncio.to_thread(detect_h264_encoder)
+        
+        # Without text overlays PyAV can encode in-process in a worker thread
+        encoded = False
+        if av is not None and len(filter_complex) == 1:
+            try:
+                await asyncio.to_thread(
+                    _encode_frames_with_av, frames, output_path, fps, duration_per_frame, video_encoder
+                )
+                encoded = True
+            except Exception as e:
+                # Reported so a broken PyAV install does not silently add an ffmpeg run to every call
+                print(f"PyAV could not encode {output_path}, falling back to ffmpeg: {e}")
         
-        # Get video information
-        info_cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=width,height,duration,nb_frames",
-            "-of", "json",
-            output_path
-        ]
+        if not encoded:
+            cmd = [
+                "ffmpeg",
+                *input_args,
+                "-c:v", video_encoder,
+                "-pix_fmt", "yuv420p",
+                "-r", str(fps),
+                "-vf", ",".join(filter_complex),
+                output_path,
+                "-y"  # Overwrite existing file
+            ]
+            await _run_command(cmd, input=manifest)
         
-        info_result = subprocess.run(info_cmd, check=True, capture_output=True, text=True)
-        info_json = json.loads(info_result.stdout)
+        # Get video information
+        stream_info = await probe_stream(output_path, "v:0", "width,height,duration,nb_frames")
         
         # Extract video information
-        stream_info = info_json.get("streams", [{}])[0]
         width = stream_info.get("width", 0)
         height = stream_info.get("height", 0)
         duration = float(stream_info.get("duration", total_duration))
         frame_count = int(stream_info.get("nb_frames", total_frames))
         
-        # Clean up temporary files
-        try:
-            os.remove(script_path)
-            os.rmdir(temp_dir)
-        except:
-            pass
-        
         return {
             "status": "success",
             "output_path": output_path,
@@ -313,7 +548,7 @@ def create_video_from_frames(
         }
 
 @function_tool
-def extract_audio_from_video(video_path: str, output_path: Optional[str]) -> Dict[str, Any]:
+async def extract_audio_from_video(video_path: str, output_path: Optional[str]) -> Dict[str, Any]:
     """
     Extract audio from a video file.
     
@@ -331,13 +566,6 @@ def extract_audio_from_video(video_path: str, output_path: Optional[str]) -> Dic
             output_basename = os.path.splitext(os.path.basename(video_path))[0] + ".mp3"
             output_path = os.path.join(output_dir, output_basename)
         
-        # Check if video file exists
-        if not os.path.exists(video_path):
-            return {
-                "status": "error",
-                "message": f"Video file not found: {video_path}"
-            }
-        
         # Extract audio using ffmpeg
         cmd = [
             "ffmpeg",
@@ -348,30 +576,29 @@ def extract_audio_from_video(video_path: str, output_path: Optional[str]) -> Dic
             "-y"  # Overwrite existing file
         ]
         
-        subprocess.run(cmd, check=True, capture_output=True)
-        
-        # Check if output file exists
-        if not os.path.exists(output_path):
-            return {
-                "status": "error",
-                "message": f"Failed to extract audio: output file not created"
-            }
+        try:
+            await _run_command(cmd)
+        except subprocess.CalledProcessError:
+            # Check if video file exists only once ffmpeg has failed
+            if not os.path.exists(video_path):
+                return {
+                    "status": "error",
+                    "message": f"Video file not found: {video_path}"
+                }
+            raise
         
         # Get audio information
-        info_cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-select_streams", "a:0",
-            "-show_entries", "stream=duration,sample_rate,channels",
-            "-of", "json",
-            output_path
-        ]
-        
-        info_result = subprocess.run(info_cmd, check=True, capture_output=True, text=True)
-        info_json = json.loads(info_result.stdout)
+        try:
+            stream_info = await probe_stream(output_path, "a:0", "duration,sample_rate,channels")
+        except (FileNotFoundError, subprocess.CalledProcessError):
+            if not os.path.exists(output_path):
+                return {
+                    "status": "error",
+                    "message": f"Failed to extract audio: output file not created"
+                }
+            raise
         
         # Extract audio information
-        stream_info = info_json.get("streams", [{}])[0]
         duration = float(stream_info.get("duration", 0))
         sample_rate = int(stream_info.get("sample_rate", 0))
         channels = int(stream_info.get("channels", 0))
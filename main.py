@@ -3,20 +3,29 @@ import asyncio
 import argparse
 from agents import set_default_openai_key, RunConfig
 from utils.agent_printer import setup_printer, create_agent_hooks
+from utils.agent_cache import cached_run
+from utils.openai_clients import get_async_openai_client
 from pydantic import BaseModel
-from agents import Agent, handoff, Runner, trace, WebSearchTool
+from agents import Agent, handoff, trace, WebSearchTool
+from agents.exceptions import MaxTurnsExceeded
 from components.search_tool import *
 from components.code_tool import *
 from components.manager_tool import *
 from components.video_process_tool import *
+from components.video_process_tool import probe_stream, detect_h264_encoder
 from agents.model_settings import ModelSettings
-from openai import OpenAI
+from openai import AsyncOpenAI
 import tempfile
-import json
 import datetime
-import subprocess
-from typing import Optional, List, Dict, Any
+import hashlib
+import shutil
+import csv
+import time
+import stat
+from utils import fast_json
+from typing import Optional, List, Dict, Any, Tuple, Union
 import re
+import textwrap
 
 class codeagentoutput(BaseModel):
     video_path: str
@@ -24,6 +33,10 @@ class codeagentoutput(BaseModel):
     video_exists: bool
     audio_exists: bool
 
+class videoframesoutput(BaseModel):
+    frames_dir: str
+    timestamps: List[str]
+
 class videounderstandingoutput(BaseModel):
     summary: str
     key_steps: Optional[List[Dict[str, Any]]] = None
@@ -34,10 +47,19 @@ class videoeditingoutput(BaseModel):
     duration: int
     frame_count: int
 
+# Rules every agent follows; kept as the leading part of each prompt so the provider's prompt cache can reuse it
+_SHARED_PREFIX = textwrap.dedent("""
+    You are one of the agents in a video processing system that finds, downloads, analyzes and edits videos.
+    
+    GENERAL RULES:
+    - Act on the request IMMEDIATELY; DO NOT ask for additional information or clarification
+    - Use your tools to do the work and specify ALL parameters when calling a tool
+    - DO NOT repeat a tool call that has already succeeded
+    - Return your final result as soon as your task is complete
+    """)
+
 # Remove ASR agent since we'll use direct API calls
-code_agent = Agent(
-    name="Code Agent",
-    instructions="""
+_CODE_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
     You are a Code Agent responsible for generating and executing Python code.
     Your job is to:
     1. Take a task description and input data
@@ -59,9 +81,11 @@ code_agent = Agent(
     - ALWAYS use the execute_python_code tool to run your code
     - After executing the code, IMMEDIATELY return the results
     - Include the full paths to the downloaded video AND audio files in your response
+    - Assign the results you want back to a dict named __result__ at the end of your code
     - ALWAYS use os.path.abspath() to get the absolute path of the current working directory
     - Use a SIMPLE filename format like "content_type.mp4" instead of the full video title
     - For audio extraction, PREFER using yt-dlp's built-in functionality directly rather than ffmpeg
+    - Download the video and extract the audio in ONE yt-dlp call (-x with -k keeps the video); never download the same URL twice
     
     WORKFLOW:
     1. Generate Python code to download the video and extract audio
@@ -71,6 +95,7 @@ code_agent = Agent(
     SAMPLE CODE FOR DOWNLOADING VIDEOS AND EXTRACTING AUDIO:
     ```python
     import os
+    import glob
     import subprocess
     import re
     
@@ -92,27 +117,34 @@ code_agent = Agent(
     audio_path = os.path.join(videos_dir, audio_filename)
     
     try:
-        # Check if yt-dlp is installed
-        subprocess.run(["yt-dlp", "--version"], check=True, capture_output=True)
-        
-        # Download the video with a specific filename
-        print(f"Downloading video to {video_path}...")
-        video_result = subprocess.run(
-            ["yt-dlp", "-o", video_path, "--format", "mp4", video_url],
+        # Download the video once and extract the audio from the same download:
+        # merge best video+audio into an mp4, then -x writes the mp3 and -k keeps the mp4
+        # (-k also keeps the per-format files the mp4 was merged from; they are removed below).
+        # A single-file fallback prefers mp4 but may still be another container, found below
+        print(f"Downloading video to {video_path} and extracting audio to {audio_path}...")
+        download_result = subprocess.run(
+            [
+                "yt-dlp",
+                "-f", "bv*+ba/b[ext=mp4]/b",
+                "--merge-output-format", "mp4",
+                "-x", "--audio-format", "mp3", "-k",
+                "-o", os.path.join(videos_dir, f"{video_type}.%(ext)s"),
+                video_url
+            ],
             check=True,
             capture_output=True,
             text=True
         )
         
-        # Download audio separately using yt-dlp
-        print(f"Extracting audio to {audio_path}...")
-        audio_result = subprocess.run(
-            ["yt-dlp", "-o", audio_path, "--extract-audio", "--audio-format", "mp3", video_url],
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        audio_extracted = True
+        # Remove the pre-merge format files such as cooking_video.f137.mp4 and cooking_video.f251.webm
+        for intermediate in glob.glob(os.path.join(videos_dir, f"{video_type}.f[0-9]*")):
+            os.remove(intermediate)
+        
+        # Without a separate audio stream the video keeps its own container, e.g. cooking_video.webm
+        if not os.path.exists(video_path):
+            downloaded = [path for path in glob.glob(os.path.join(videos_dir, f"{video_type}.*")) if path != audio_path]
+            if downloaded:
+                video_path = downloaded[0]
         
         # Get the output file paths
         video_file_path = video_path
@@ -133,6 +165,11 @@ code_agent = Agent(
             "audio_exists": audio_exists
         }
             
+    except FileNotFoundError as e:
+        status = "error"
+        message = "yt-dlp is not installed"
+        error = str(e)
+        file_info = {"error": error}
     except subprocess.CalledProcessError as e:
         status = "error"
         message = f"Failed to process media: {e.stderr}"
@@ -143,11 +180,18 @@ code_agent = Agent(
         message = f"Error: {str(e)}"
         error = str(e)
         file_info = {"error": error}
+    
+    # Return the results as the tool's outputs
+    __result__ = {"status": status, "message": message, **file_info}
     ```
     
     Always check if required packages are installed before using them.
     Write clean, efficient, and well-documented code.
-    """,
+    """)
+
+code_agent = Agent(
+    name="Code Agent",
+    instructions=_CODE_AGENT_INSTRUCTIONS,
     handoff_description="An agent that generates and executes Python code for tasks like video downloading and audio extraction.",
     tools=[execute_python_code, get_installed_packages],
     model_settings=ModelSettings(tool_choice="auto"),
@@ -156,9 +200,7 @@ code_agent = Agent(
 ) 
 
 # Add Video Editing Agent
-video_editing_agent = Agent(
-    name="Video Editing Agent",
-    instructions="""
+_VIDEO_EDITING_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
     You are a Video Editing Agent responsible for creating a short video from key frames extracted from a longer video.
     Your job is to:
     1. Take a directory of key frames and transcript information
@@ -191,7 +233,11 @@ video_editing_agent = Agent(
     2. Generate a script for the video based on the key steps
     3. Use the create_video_from_frames tool to create a video with text overlays
     4. Return information about the created video
-    """,
+    """)
+
+video_editing_agent = Agent(
+    name="Video Editing Agent",
+    instructions=_VIDEO_EDITING_AGENT_INSTRUCTIONS,
     handoff_description="An agent that creates short videos from key frames with text overlays.",
     tools=[execute_python_code, create_video_from_frames],
     model_settings=ModelSettings(tool_choice="auto"),
@@ -199,21 +245,48 @@ video_editing_agent = Agent(
     output_type=videoeditingoutput
 )
 
-# Add Video Understanding Agent
-video_understanding_agent = Agent(
-    name="Video Understanding Agent",
-    instructions="""
-    You are a Video Understanding Agent responsible for extracting key frames and summarizing the process shown in a video.
+# Add Video Frame Extraction Agent (first phase of video understanding, runs alongside transcription)
+_VIDEO_FRAMES_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
+    You are a Video Frame Extraction Agent responsible for sampling frames from a video.
     Your job is to:
-    1. Take a video file path and transcript information
-    2. Extract frames from key timestamps in the video
-    3. Analyze the frames and transcript to understand the process shown
-    4. Create a comprehensive summary of the steps shown in the video
-    5. Return the summary and key steps with timestamps and frame references
+    1. Take a video file path and, when known, its duration
+    2. Extract frames evenly across the whole video
+    3. Return the frames directory and the timestamps you extracted
+    
+    IMPORTANT:
+    - The transcript is NOT available yet, so do not wait for it or ask for it
+    - IMMEDIATELY call extract_video_frames ONCE with ALL timestamps
+    - You MUST specify ALL parameters when calling extract_video_frames:
+      * video_path: The path to the video file
+      * timestamps: Array of timestamps in MM:SS format
+      * output_dir: Set to null to use default output directory
+    - Sample one frame every 10 seconds starting at 00:00 and staying within the video duration
+    - If the duration is not given, assume the video is 5 minutes long
+    - Return the frames_dir and timestamps reported by the tool
+    """)
+
+video_frames_agent = Agent(
+    name="Video Frame Extraction Agent",
+    instructions=_VIDEO_FRAMES_AGENT_INSTRUCTIONS,
+    handoff_description="An agent that samples frames evenly across a video.",
+    tools=[extract_video_frames],
+    model_settings=ModelSettings(tool_choice="auto"),
+    model="gpt-4o",
+    output_type=videoframesoutput
+)
+
+# Add Video Understanding Agent (second phase: summarize using transcript and extracted frames)
+_VIDEO_UNDERSTANDING_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
+    You are a Video Understanding Agent responsible for summarizing the process shown in a video.
+    Your job is to:
+    1. Take a video file path, transcript information and the frames already extracted from the video
+    2. Analyze the frames and transcript to understand the process shown
+    3. Create a comprehensive summary of the steps shown in the video
+    4. Return the summary and key steps with timestamps and frame references
     
     For video analysis tasks:
     - Use the read_transcript_json tool to read the transcript data from the JSON file
-    - Use the extract_video_frames tool to extract frames at key timestamps
+    - Frames have already been extracted; their directory and timestamps are given in the request
     - Use the transcript and key points from the audio processing to identify important moments
     - Create a detailed summary of the process shown in the video
     - Identify and list the key steps in chronological order
@@ -221,12 +294,12 @@ video_understanding_agent = Agent(
     
     IMPORTANT:
     - When you receive a video path and transcript data, IMMEDIATELY read the transcript JSON file
-    - You MUST specify ALL parameters when calling extract_video_frames:
+    - Use the key points and timestamps from the transcript to identify important moments
+    - Reference the extracted frame closest to each key step
+    - Only if NO frames were extracted, use extract_video_frames at the key timestamps, specifying ALL parameters:
       * video_path: The path to the video file
       * timestamps: Array of timestamps in MM:SS format
       * output_dir: Set to null to use default output directory
-    - Use the key points and timestamps from the transcript to identify important moments
-    - Extract frames at those key timestamps
     - Focus on understanding the PROCESS being demonstrated in the video
     - For cooking videos, identify ingredients, techniques, and important steps
     - Create a summary that would help someone learn how to perform the process
@@ -237,21 +310,23 @@ video_understanding_agent = Agent(
     WORKFLOW:
     1. Read the transcript and key points from the provided JSON file using read_transcript_json
     2. Identify key timestamps where important steps occur
-    3. Use extract_video_frames to capture frames at those timestamps
+    3. Match each key step to the nearest extracted frame
     4. Analyze the frames and transcript together
     5. Create a comprehensive summary and list of key steps
     6. Return the results with at minimum a summary and frames_dir, and optionally key_steps if you identified any
-    """,
-    handoff_description="An agent that extracts key frames and summarizes the process shown in a video.",
+    """)
+
+video_understanding_agent = Agent(
+    name="Video Understanding Agent",
+    instructions=_VIDEO_UNDERSTANDING_AGENT_INSTRUCTIONS,
+    handoff_description="An agent that summarizes the process shown in a video from its transcript and key frames.",
     tools=[execute_python_code, extract_video_frames, read_transcript_json],
     model_settings=ModelSettings(tool_choice="auto"),
     model="gpt-4o",
     output_type=videounderstandingoutput
 )
 
-search_agent = Agent(
-    name="Search Agent",
-    instructions="""
+_SEARCH_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
     You are a Searcher Agent responsible for finding high-quality videos.
     Your job is to:
     1. Take a search query for a specific type of video
@@ -279,7 +354,11 @@ search_agent = Agent(
     2. Select the best video based on relevance and view count
     3. Verify the video URL ONCE using verify_video_url
     4. If verification is successful, STOP using tools and RETURN your final response to the Code Agent using handoff()
-    """,
+    """)
+
+search_agent = Agent(
+    name="Search Agent",
+    instructions=_SEARCH_AGENT_INSTRUCTIONS,
     handoff_description="An agent that searches for high-quality videos and returns their URLs.",
     tools=[WebSearchTool(), search_youtube_videos, verify_video_url],
     model_settings=ModelSettings(tool_choice="auto"),
@@ -287,9 +366,7 @@ search_agent = Agent(
 )
 
 # Create the Manager Agent
-manager_agent = Agent(
-    name="Manager Agent",
-    instructions="""
+_MANAGER_AGENT_INSTRUCTIONS = _SHARED_PREFIX + textwrap.dedent("""
     You are a Manager Agent responsible for coordinating the video processing workflow.
     Your job is to:
     1. Understand the user's request for searching for a video
@@ -335,13 +412,73 @@ manager_agent = Agent(
     5. Call transfer_to_code_agent("Please download this video: https://www.youtube.com/watch?v=example and save it to the videos directory")
     6. Code Agent downloads the video and returns the results
     7. Return a summary to the user
-    """,
+    """)
+
+manager_agent = Agent(
+    name="Manager Agent",
+    instructions=_MANAGER_AGENT_INSTRUCTIONS,
     handoffs=[
         handoff(search_agent),
         handoff(code_agent)
     ],
-    tools=[list_available_videos, get_video_info]
+    tools=[list_available_videos, get_video_info, get_video_info_batch]
+)
+
+# Turn limits for each agent run; each turn is a full LLM round-trip. A limit covers the agents handed off
+# to within the same run: search takes 4 turns (web search, YouTube search, verify, handoff) and the
+# Code Agent 3 more (check packages, run code, return), and the manager adds its own handoff on top
+_MANAGER_MAX_TURNS = 10
+_SEARCH_MAX_TURNS = 9
+_CODE_MAX_TURNS = 4
+_FRAMES_MAX_TURNS = 4
+_UNDERSTANDING_MAX_TURNS = 6
+_EDITING_MAX_TURNS = 4
+
+# Final responses of completed requests, so replaying the same request skips the whole pipeline
+_RESPONSE_CACHE_DIR = os.path.join(".cache", "responses")
+_RESPONSE_CACHE_TTL_SECONDS = 86400
+
+# Video URLs in a user request or a Search Agent answer, handed straight to the Code Agent
+_URL_RE = re.compile(r"https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)[A-Za-z0-9_\-]{6,}")
+# Local video file names in a user request, which only the Manager Agent knows how to look up
+_VIDEO_FILE_RE = re.compile(r"[\w\-.]+\.(?:mp4|avi|mov|mkv|webm)\b", re.IGNORECASE)
+
+# Keywords that might indicate important information, or a numbered step such as "1." or "2:".
+# Keywords match anywhere in the line (so "steps" and "first" in "firstly" count), case-insensitively.
+_KEY_WORDS = (
+    r"important|key|step|first|second|third|next|finally|remember|note|tip|trick"
+    r"|essential|must|crucial|critical|necessary|vital"
 )
+_KEY_RE = re.compile(rf"{_KEY_WORDS}|\d+\s*[.:]", re.IGNORECASE)
+# Whole matching lines of lowercased text, so large transcripts are scanned in one pass
+# without splitting; the numbered-step whitespace must not run onto the next line
+_KEY_LINE_RE = re.compile(rf"^.*?(?:{_KEY_WORDS}|\d+[^\S\n]*[.:]).*$", re.MULTILINE)
+# Above this many characters, scanning the whole transcript beats per-line searches
+_LARGE_TRANSCRIPT_CHARS = 50_000
+
+# Transcript cache: audio larger than twice the sample size is hashed from samples, entries expire after a week
+_HASH_SAMPLE_BYTES = 4 * 1024 * 1024
+_TRANSCRIPT_CACHE_TTL_SECONDS = 7 * 86400
+
+# Whisper API upload limit
+_WHISPER_MAX_BYTES = 25 * 1024 * 1024
+
+# Maximum number of concurrent ffmpeg/ffprobe processes
+_MAX_FFMPEG = int(os.getenv("MAX_FFMPEG", os.cpu_count() or 4))
+_ffmpeg_semaphore: Optional[asyncio.Semaphore] = None
+
+# Audio is transcribed in shards of this many seconds, with a bounded number of requests in flight
+# across all videos being processed
+_SHARD_SECONDS = 60
+_MAX_CONCURRENT_TRANSCRIPTIONS = 6
+_transcription_semaphore: Optional[asyncio.Semaphore] = None
+
+# Sampled frames are named frame_<n>_<seconds>s.jpg by extract_video_frames; key steps give MM:SS timestamps
+_FRAME_SECONDS_RE = re.compile(r"_(\d+)s\.(?:jpg|png)$")
+_STEP_TIMESTAMP_RE = re.compile(r"(\d+):(\d{2})")
+
+# Preformatted MM:SS strings for the first two hours
+_TS_CACHE = tuple(f"{m:02d}:{s:02d}" for m in range(120) for s in range(60))
 
 # Add functions for direct audio transcription
 def format_timestamp(seconds: float) -> str:
@@ -354,42 +491,104 @@ def format_timestamp(seconds: float) -> str:
     Returns:
         Formatted time string
     """
-    minutes = int(seconds // 60)
-    remaining_seconds = int(seconds % 60)
-    return f"{minutes:02d}:{remaining_seconds:02d}"
+    total_seconds = int(seconds)
+    if 0 <= total_seconds < len(_TS_CACHE):
+        return _TS_CACHE[total_seconds]
+    return "%02d:%02d" % divmod(total_seconds, 60)
 
-def transcribe_audio(audio_path: str, client: OpenAI) -> str:
+async def split_audio_into_shards(audio_path: str, shard_dir: str) -> List[Tuple[str, float]]:
     """
-    Transcribe audio using OpenAI's Audio API directly.
+    Split an audio file into fixed-length shards without re-encoding.
     
     Args:
         audio_path: Path to the audio file
-        client: OpenAI client
+        shard_dir: Directory to write the shards to
         
     Returns:
-        Transcribed text with timestamps
+        List of (shard path, start offset in seconds), empty if splitting failed
     """
-    print(f"Transcribing audio file: {audio_path}")
+    extension = os.path.splitext(audio_path)[1] or ".mp3"
+    segment_list = os.path.join(shard_dir, "segments.csv")
+    cmd = [
+        "ffmpeg",
+        "-i", audio_path,
+        "-f", "segment",
+        "-segment_time", str(_SHARD_SECONDS),
+        "-segment_list", segment_list,
+        "-segment_list_type", "csv",
+        "-c", "copy",
+        os.path.join(shard_dir, f"shard_%03d{extension}"),
+        "-y"
+    ]
+    returncode, _ = await run_ffmpeg_command(cmd)
+    if returncode != 0:
+        return []
     
-    try:
-        with open(audio_path, "rb") as audio_file:
+    # Stream copy cuts on packet boundaries, so use the actual start times ffmpeg reports
+    shards = []
+    with open(segment_list, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2:
+                shards.append((os.path.join(shard_dir, row[0]), float(row[1])))
+    return shards
+
+async def transcribe_shard(shard_path: str, offset: float, client: AsyncOpenAI, semaphore: asyncio.Semaphore) -> List[str]:
+    """
+    Transcribe one audio shard and format its segments.
+    
+    Args:
+        shard_path: Path to the audio shard
+        offset: Start of the shard within the full audio, in seconds
+        client: Async OpenAI client
+        semaphore: Semaphore bounding concurrent Whisper requests
+        
+    Returns:
+        Formatted transcript lines with timestamps relative to the full audio
+    """
+    async with semaphore:
+        with open(shard_path, "rb") as audio_file:
             # Use the OpenAI Audio API to transcribe the audio
-            response = client.audio.transcriptions.create(
+            response = await client.audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
                 response_format="verbose_json",
                 timestamp_granularities=["segment"]
             )
+    
+    _ft = format_timestamp
+    return [
+        f"[{_ft(offset + segment.start)}] - [{_ft(offset + segment.end)}] - {segment.text.strip()}"
+        for segment in response.segments
+    ]
+
+async def transcribe_audio(audio_path: str, client: AsyncOpenAI) -> str:
+    """
+    Transcribe audio using OpenAI's Audio API directly.
+    
+    The audio is split into shards that are transcribed concurrently.
+    
+    Args:
+        audio_path: Path to the audio file
+        client: Async OpenAI client
+        
+    Returns:
+        Transcribed text with timestamps
+    """
+    print(f"Transcribing audio file: {audio_path}")
+    
+    try:
+        with tempfile.TemporaryDirectory() as shard_dir:
+            # Fall back to a single request if the audio cannot be split
+            shards = await split_audio_into_shards(audio_path, shard_dir) or [(audio_path, 0.0)]
             
-            # Format the response with timestamps
-            formatted_transcript = ""
-            for segment in response.segments:
-                start_time = format_timestamp(segment.start)
-                end_time = format_timestamp(segment.end)
-                text = segment.text.strip()
-                formatted_transcript += f"[{start_time}] - [{end_time}] - {text}\n"
-            
-            return formatted_transcript.strip()
+            semaphore = get_transcription_semaphore()
+            shard_lines = await asyncio.gather(*(
+                transcribe_shard(shard_path, offset, client, semaphore)
+                for shard_path, offset in shards
+            ))
+        
+        # Format the response with timestamps
+        return "\n".join(line for lines in shard_lines for line in lines)
     
     except Exception as e:
         print(f"Error transcribing audio: {e}")
@@ -405,29 +604,30 @@ def extract_key_points(transcript: str) -> List[str]:
     Returns:
         List of key information points
     """
-    key_points = []
-    
-    # Split transcript by lines
-    lines = transcript.strip().split('\n')
-    
-    # List of keywords that might indicate important information
-    key_words = [
-        "important", "key", "step", "first", "second", "third", "next", 
-        "finally", "remember", "note", "tip", "trick", "essential",
-        "must", "crucial", "critical", "necessary", "vital"
-    ]
-    
-    for line in lines:
-        # Check if line contains any keywords
-        if any(word in line.lower() for word in key_words):
-            key_points.append(line)
-        # Or if it contains numbered steps
-        elif re.search(r'\d+\s*[\.:]', line):
-            key_points.append(line)
+    # Keep lines that mention a keyword or contain a numbered step
+    transcript = transcript.strip()
+    if len(transcript) >= _LARGE_TRANSCRIPT_CHARS:
+        # Lowercase once and match case-sensitively, which is much cheaper than IGNORECASE;
+        # the spans only line up with the original text if lowercasing kept every length
+        lowered = transcript.lower()
+        if len(lowered) == len(transcript):
+            return [transcript[match.start():match.end()] for match in _KEY_LINE_RE.finditer(lowered)]
+    return [line for line in transcript.split('\n') if _KEY_RE.search(line)]
+
+def write_file_atomic(path: str, data: bytes) -> None:
+    """
+    Write a file so readers never see it half-written.
     
-    return key_points
+    Args:
+        path: Destination path
+        data: File content
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
 
-def save_transcript_to_json(audio_path: str, transcript: str, key_points: Optional[List[str]] = None) -> str:
+async def save_transcript_to_json(audio_path: str, transcript: str, key_points: Optional[List[str]] = None, indent: bool = False) -> str:
     """
     Save the transcript results to a JSON file.
     
@@ -435,6 +635,7 @@ def save_transcript_to_json(audio_path: str, transcript: str, key_points: Option
         audio_path: Path to the audio file
         transcript: Transcribed text
         key_points: List of extracted key points
+        indent: Whether to pretty-print the JSON
         
     Returns:
         Path to the JSON file
@@ -459,45 +660,160 @@ def save_transcript_to_json(audio_path: str, transcript: str, key_points: Option
     if key_points:
         transcript_data["key_points"] = key_points
     
-    # Save as JSON
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(transcript_data, f, ensure_ascii=False, indent=2)
+    # Save as JSON, off the event loop and atomically
+    await asyncio.to_thread(write_file_atomic, json_path, fast_json.dumps(transcript_data, indent=indent))
     
     return json_path
 
-def convert_audio_to_mp3(audio_path: str, max_duration: Optional[int] = 120) -> str:
+def hash_audio_file(audio_path: str) -> str:
+    """
+    Hash the content of an audio file for the transcript cache.
+    
+    Small files are hashed in full; larger ones by their size plus their first
+    and last _HASH_SAMPLE_BYTES, which tells different recordings apart without
+    reading the whole file.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        Hex BLAKE2b digest of the file content
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(audio_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 2 * _HASH_SAMPLE_BYTES:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        else:
+            digest.update(size.to_bytes(8, "little"))
+            digest.update(f.read(_HASH_SAMPLE_BYTES))
+            f.seek(-_HASH_SAMPLE_BYTES, os.SEEK_END)
+            digest.update(f.read(_HASH_SAMPLE_BYTES))
+    return digest.hexdigest()
+
+def get_ffmpeg_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent ffmpeg/ffprobe processes.
+    
+    Created on first use so it belongs to the running event loop.
+    
+    Returns:
+        The shared semaphore
+    """
+    global _ffmpeg_semaphore
+    if _ffmpeg_semaphore is None:
+        _ffmpeg_semaphore = asyncio.Semaphore(_MAX_FFMPEG)
+    return _ffmpeg_semaphore
+
+def get_transcription_semaphore() -> asyncio.Semaphore:
+    """
+    Get the semaphore bounding concurrent Whisper requests.
+    
+    Created on first use so it belongs to the running event loop.
+    
+    Returns:
+        The shared semaphore
+    """
+    global _transcription_semaphore
+    if _transcription_semaphore is None:
+        _transcription_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_TRANSCRIPTIONS)
+    return _transcription_semaphore
+
+async def run_ffmpeg_command(cmd: List[str]) -> Tuple[int, bytes]:
+    """
+    Run an ffmpeg/ffprobe command without blocking the event loop.
+    
+    Args:
+        cmd: Command and arguments
+        
+    Returns:
+        Tuple of (return code, stdout)
+    """
+    async with get_ffmpeg_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+    return process.returncode, stdout
+
+async def probe_audio_format(audio_path: str) -> Dict[str, Any]:
+    """
+    Read container information for an audio file with ffprobe.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        The ffprobe "format" section, or an empty dict if probing failed
+    """
+    returncode, stdout = await run_ffmpeg_command(
+        ["ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", audio_path]
+    )
+    if returncode != 0:
+        return {}
+    try:
+        return fast_json.loads(stdout).get("format", {})
+    except fast_json.JSONDecodeError:
+        return {}
+
+async def convert_audio_to_mp3(audio_path: str, output_dir: str, max_duration: Optional[int] = 120) -> str:
     """
     Convert audio file to MP3 format and limit its length.
     
+    MP3 input that already fits the duration and Whisper's upload limit is
+    returned unchanged, and MP3 input that is only too long is trimmed with
+    a stream copy; everything else is re-encoded.
+    
     Args:
         audio_path: Path to the original audio file
+        output_dir: Directory for the converted file, owned by the caller
         max_duration: Maximum duration in seconds
         
     Returns:
-        Path to the converted MP3 file
+        Path to the MP3 file to transcribe, which may be audio_path itself
     """
     try:
-        # Create temporary directory
-        temp_dir = tempfile.mkdtemp()
+        audio_format = await probe_audio_format(audio_path)
+        is_mp3 = "mp3" in audio_format.get("format_name", "").split(",")
+        duration = float(audio_format.get("duration", 0) or 0)
+        bit_rate = float(audio_format.get("bit_rate", 0) or 0)
+        size = int(audio_format.get("size", 0) or 0)
+        
+        # Already a small enough mp3 within the duration limit, nothing to do
+        if is_mp3 and 0 < size <= _WHISPER_MAX_BYTES and (max_duration is None or duration <= max_duration):
+            print(f"Audio is already a suitable MP3, skipping conversion: {audio_path}")
+            return audio_path
         
         # Generate output filename
         output_basename = "converted_audio.mp3"
-        output_path = os.path.join(temp_dir, output_basename)
+        output_path = os.path.join(output_dir, output_basename)
+        
+        duration_args = ["-t", str(max_duration)] if max_duration is not None else []  # Limit length
+        if is_mp3 and max_duration is not None and 0 < bit_rate * max_duration / 8 <= _WHISPER_MAX_BYTES:
+            # Only too long: trim without re-encoding
+            codec_args = ["-c", "copy"]
+        else:
+            codec_args = [
+                "-ac", "1",  # Mono
+                "-ar", "16000",  # 16kHz sampling rate
+                "-ab", "64k",  # 64kbps bitrate
+            ]
         
         # Conversion command
         cmd = [
             "ffmpeg",
             "-i", audio_path,
-            "-t", str(max_duration),  # Limit length
-            "-ac", "1",  # Mono
-            "-ar", "16000",  # 16kHz sampling rate
-            "-ab", "64k",  # 64kbps bitrate
+            *duration_args,
+            *codec_args,
             output_path,
             "-y"  # Overwrite existing file
         ]
         
         # Execute command
-        subprocess.run(cmd, capture_output=True)
+        await run_ffmpeg_command(cmd)
         
         print(f"Audio converted and saved to: {output_path}")
         return output_path
@@ -517,36 +833,54 @@ async def process_audio(audio_path: str) -> Dict[str, Any]:
         Dictionary with transcript and key points
     """
     try:
-        # Check if file exists
-        if not os.path.exists(audio_path):
-            return {"error": f"Audio file does not exist: {audio_path}"}
-        
-        # Convert audio file to smaller MP3
-        print("Converting audio file...")
-        converted_audio = convert_audio_to_mp3(audio_path, max_duration=600)  # 10 minutes max
-        
-        # Initialize OpenAI client
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-        
-        # Transcribe audio
-        print("Transcribing audio...")
-        transcript = transcribe_audio(converted_audio, client)
-        
-        # Extract key points
-        key_points = extract_key_points(transcript)
-        
-        # Save as JSON
-        json_path = save_transcript_to_json(audio_path, transcript, key_points)
-        print(f"Transcription results saved to: {json_path}")
-        
-        # Clean up temporary files
-        try:
-            os.remove(converted_audio)
-            os.rmdir(os.path.dirname(converted_audio))
-            print("Temporary files cleaned up")
-        except:
-            pass
+        # Check if file exists and has content
+        if not _usable(audio_path):
+            return {"error": f"Audio file does not exist or is empty: {audio_path}"}
         
+        # Temporary files live in a directory that is removed as a whole, never the original audio
+        with tempfile.TemporaryDirectory(prefix="va_") as temp_dir:
+            # Convert audio file to smaller MP3
+            print("Converting audio file...")
+            converted_audio = await convert_audio_to_mp3(audio_path, temp_dir, max_duration=600)  # 10 minutes max
+            
+            # Look up a previous transcription of the same audio content
+            cache_path = None
+            if not os.environ.get("DISABLE_TRANSCRIPT_CACHE"):
+                audio_hash = await asyncio.to_thread(hash_audio_file, converted_audio)
+                cache_path = os.path.join(os.path.dirname(audio_path), "transcripts", f"{audio_hash}.json")
+            
+            cached = None
+            if cache_path is not None:
+                try:
+                    with open(cache_path, 'rb') as f:
+                        # Expired entries are transcribed again and overwritten
+                        if time.time() - os.fstat(f.fileno()).st_mtime <= _TRANSCRIPT_CACHE_TTL_SECONDS:
+                            cached = fast_json.loads(f.read())
+                except (FileNotFoundError, fast_json.JSONDecodeError):
+                    cached = None
+            
+            if cached is not None and "transcript" in cached:
+                print(f"Using cached transcript: {cache_path}")
+                transcript = cached["transcript"]
+                key_points = cached.get("key_points", [])
+                json_path = cache_path
+            else:
+                # Transcribe audio with the shared client
+                print("Transcribing audio...")
+                transcript = await transcribe_audio(converted_audio, get_async_openai_client())
+                
+                # Extract key points off the event loop so other downloads and requests keep running
+                key_points = await asyncio.to_thread(extract_key_points, transcript)
+                
+                # Save as JSON
+                json_path = await save_transcript_to_json(audio_path, transcript, key_points)
+                print(f"Transcription results saved to: {json_path}")
+                
+                # Only cache successful transcriptions
+                if cache_path is not None and not transcript.startswith("Error transcribing audio"):
+                    await asyncio.to_thread(shutil.copyfile, json_path, cache_path + ".tmp")
+                    os.replace(cache_path + ".tmp", cache_path)
+            
         return {
             "transcript": transcript,
             "key_points": key_points,
@@ -557,8 +891,349 @@ async def process_audio(audio_path: str) -> Dict[str, Any]:
         print(f"Error processing audio: {e}")
         return {"error": str(e)}
 
+async def extract_frames_phase(video_path: str, run_config: Optional[RunConfig] = None, hooks = None) -> Optional[videoframesoutput]:
+    """
+    Run the frame extraction phase of video understanding.
+    
+    Args:
+        video_path: Path to the video file
+        run_config: Optional RunConfig for customizing the run
+        hooks: Optional hooks for the run
+        
+    Returns:
+        The extracted frames, or None if extraction failed
+    """
+    try:
+        duration = (await probe_stream(video_path, "v:0", "duration")).get("duration")
+    except Exception:
+        duration = None
+    
+    frames_request = f"Please extract frames from this video: {video_path}."
+    if duration:
+        frames_request += f" The video is {int(float(duration))} seconds long."
+    
+    try:
+        frames_result = await cached_run(
+            video_frames_agent,
+            frames_request,
+            run_config=run_config,
+            hooks=hooks,
+            max_turns=_FRAMES_MAX_TURNS
+        )
+    except Exception as e:
+        print(f"Error extracting frames: {e}")
+        return None
+    
+    frames_output = frames_result.final_output
+    return frames_output if isinstance(frames_output, videoframesoutput) else None
+
+def _usable(path: str) -> bool:
+    """
+    Check with a single stat that a path exists and, for files, is not empty.
+    
+    Args:
+        path: Path to a file or directory
+        
+    Returns:
+        True for a directory or a non-empty file, False otherwise
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) or st.st_size > 0
+
+async def _handle_code_output(code_output: codeagentoutput, ctx: Dict[str, Any]) -> Union[videounderstandingoutput, str]:
+    """
+    Transcribe the downloaded audio and analyze the downloaded video.
+    
+    Args:
+        code_output: Download result from the Code Agent
+        ctx: Workflow context shared between stages
+        
+    Returns:
+        The video understanding result, or a final response string
+    """
+    # Try to extract audio path from the output
+    audio_path = code_output.audio_path
+    video_path = code_output.video_path
+    
+    if not (audio_path and _usable(audio_path)):
+        return str(code_output)
+    video_usable = bool(video_path) and _usable(video_path)
+    
+    print(f"Found audio path in output: {audio_path}. Processing audio using direct API calls...")
+    
+    # Frame extraction does not need the transcript, so run it alongside transcription
+    audio_task = asyncio.create_task(process_audio(audio_path))
+    frames_task = None
+    if video_usable:
+        frames_task = asyncio.create_task(extract_frames_phase(video_path, ctx["run_config"], ctx["hooks"]))
+    
+    if frames_task is not None:
+        audio_result, frames_output = await asyncio.gather(audio_task, frames_task)
+    else:
+        audio_result, frames_output = await audio_task, None
+    
+    if "error" in audio_result:
+        return f"{code_output}\n\nAudio transcription failed: {audio_result['error']}"
+    
+    # Get the JSON path from the audio processing result
+    json_path = audio_result.get("json_path")
+    
+    # Only proceed with video understanding if not skipped
+    if json_path and video_usable and _usable(json_path):
+        print(f"Found transcript JSON at {json_path}. Transferring to Video Understanding Agent...")
+        
+        # Transfer to Video Understanding Agent for the summarization phase
+        video_understanding_request = f"Please analyze this video: {video_path} and use the transcript data from {json_path} to summarize the process."
+        if isinstance(frames_output, videoframesoutput):
+            video_understanding_request += f" Frames have already been extracted to {frames_output.frames_dir} at timestamps: {', '.join(frames_output.timestamps)}."
+        else:
+            video_understanding_request += " No frames have been extracted yet, so extract key frames first."
+        
+        try:
+            video_understanding_result = await cached_run(
+                video_understanding_agent, 
+                video_understanding_request, 
+                run_config=ctx["run_config"], 
+                hooks=ctx["hooks"], 
+                max_turns=_UNDERSTANDING_MAX_TURNS
+            )
+            if isinstance(video_understanding_result.final_output, videounderstandingoutput):
+                return video_understanding_result.final_output
+        except MaxTurnsExceeded:
+            print(f"Video Understanding Agent did not finish within {_UNDERSTANDING_MAX_TURNS} turns")
+    
+    # If we couldn't process with the Video Understanding Agent or it was skipped, return the audio processing results
+    # Joined in one pass so a long transcript is copied once
+    return "".join((
+        str(code_output),
+        "\n\n--- TRANSCRIPT ---\n",
+        audio_result["transcript"],
+        "\n\n--- KEY POINTS ---\n",
+        "\n".join(f"- {point}" for point in audio_result["key_points"])
+    ))
+
+def _collect_key_step_frames(understanding_output: videounderstandingoutput) -> Tuple[Optional[str], List[int]]:
+    """
+    Copy the frame of each key step into a directory of its own, in step order.
+    
+    The frames directory holds every sampled frame, so the Video Editing Agent gets this
+    directory instead to turn only the key steps into a video.
+    
+    Args:
+        understanding_output: Result from the Video Understanding Agent
+        
+    Returns:
+        Tuple of (key step frames directory or None if no step could be matched to a frame,
+        indices of the key steps that got a frame)
+    """
+    frames_dir = understanding_output.frames_dir
+    sampled = {}
+    for name in os.listdir(frames_dir):
+        match = _FRAME_SECONDS_RE.search(name)
+        if match:
+            sampled[int(match.group(1))] = os.path.join(frames_dir, name)
+    
+    key_frames, matched_steps = [], []
+    for i, step in enumerate(understanding_output.key_steps or []):
+        # Prefer the frame the agent referenced, else the sampled frame nearest the step's timestamp
+        frame = str(step.get("frame") or "")
+        if frame and not os.path.isabs(frame):
+            frame = os.path.join(frames_dir, os.path.basename(frame))
+        if not (frame and os.path.isfile(frame)):
+            match = _STEP_TIMESTAMP_RE.search(str(step.get("timestamp") or ""))
+            if not (match and sampled):
+                continue
+            seconds = int(match.group(1)) * 60 + int(match.group(2))
+            frame = sampled[min(sampled, key=lambda s: abs(s - seconds))]
+        key_frames.append(frame)
+        matched_steps.append(i)
+    
+    if not key_frames:
+        return None, []
+    
+    key_dir = os.path.normpath(frames_dir) + "_key_steps"
+    shutil.rmtree(key_dir, ignore_errors=True)
+    os.makedirs(key_dir)
+    for i, frame in enumerate(key_frames):
+        shutil.copyfile(frame, os.path.join(key_dir, f"step_{i+1:02d}{os.path.splitext(frame)[1]}"))
+    return key_dir, matched_steps
+
+async def _handle_understanding(understanding_output: videounderstandingoutput, ctx: Dict[str, Any]) -> Union[videoeditingoutput, str]:
+    """
+    Create a short video from the key frames found by the Video Understanding Agent.
+    
+    Args:
+        understanding_output: Result from the Video Understanding Agent
+        ctx: Workflow context shared between stages
+        
+    Returns:
+        The video editing result, or a final response string
+    """
+    # Format the key steps
+    key_steps_text = ""
+    key_steps_list = []
+    
+    if understanding_output.key_steps:
+        for i, step in enumerate(understanding_output.key_steps):
+            step_text = step.get('description', 'Step')
+            key_steps_text += f"\n{i+1}. {step_text}"
+            
+            if 'timestamp' in step:
+                key_steps_text += f" (at {step['timestamp']})"
+                step_text += f" (at {step['timestamp']})"
+            
+            if 'frame' in step:
+                key_steps_text += f" - Frame: {step['frame']}"
+            
+            key_steps_list.append(step_text)
+    else:
+        key_steps_text = "\n(No key steps identified)"
+    
+    ctx["understanding_output"] = understanding_output
+    ctx["key_steps_text"] = key_steps_text
+    
+    # Transfer to Video Editing Agent
+    key_frames_dir, matched_steps = None, []
+    # frames_dir comes from the agent's answer, so it may name a file rather than a directory
+    if understanding_output.frames_dir and os.path.isdir(understanding_output.frames_dir):
+        key_frames_dir, matched_steps = await asyncio.to_thread(_collect_key_step_frames, understanding_output)
+    
+    if key_frames_dir is not None:
+        print(f"Collected key step frames in {key_frames_dir}. Transferring to Video Editing Agent...")
+        
+        # Format key steps for the Video Editing Agent; only steps with a frame, so overlays line up with the frames
+        formatted_key_steps = ", ".join([f'"{key_steps_list[i]}"' for i in matched_steps])
+        
+        # Transfer to Video Editing Agent
+        video_editing_request = f"Please create a short video from the frames in {key_frames_dir} (one frame per key step, in order) with the following key steps: [{formatted_key_steps}]. The summary of the video is: {understanding_output.summary}"
+        
+        try:
+            video_editing_result = await cached_run(
+                video_editing_agent, 
+                video_editing_request, 
+                run_config=ctx["run_config"], 
+                hooks=ctx["hooks"], 
+                max_turns=_EDITING_MAX_TURNS
+            )
+            if isinstance(video_editing_result.final_output, videoeditingoutput):
+                return video_editing_result.final_output
+        except MaxTurnsExceeded:
+            print(f"Video Editing Agent did not finish within {_EDITING_MAX_TURNS} turns")
+    
+    # If we couldn't process with the Video Editing Agent, return the Video Understanding Agent results
+    return f"Video Analysis Summary:\n\n{understanding_output.summary}\n\nKey Steps:{key_steps_text}\n\nFrames extracted to: {understanding_output.frames_dir}"
+
+async def _handle_editing(editing_output: videoeditingoutput, ctx: Dict[str, Any]) -> str:
+    """
+    Combine the editing and understanding results into the final response.
+    
+    Args:
+        editing_output: Result from the Video Editing Agent
+        ctx: Workflow context shared between stages
+        
+    Returns:
+        The final response string
+    """
+    understanding_output = ctx["understanding_output"]
+    ctx["complete"] = True
+    return f"Video Creation Summary:\n\n" \
+           f"Created a short video highlighting the key steps.\n" \
+           f"Output video: {editing_output.output_video_path}\n" \
+           f"Duration: {editing_output.duration} seconds\n" \
+           f"Frame count: {editing_output.frame_count}\n\n" \
+           f"Video Analysis Summary:\n\n{understanding_output.summary}\n\n" \
+           f"Key Steps:{ctx['key_steps_text']}\n\n" \
+           f"Frames extracted to: {understanding_output.frames_dir}"
+
+async def _download_video_directly(user_request: str, run_config: Optional[RunConfig], hooks) -> Optional[Any]:
+    """
+    Get a video downloaded without the Manager Agent relaying between agents.
+    
+    A URL in the request goes straight to the Code Agent; otherwise the Search Agent
+    runs on its own and the URL in its answer is passed to the Code Agent in Python.
+    
+    Args:
+        user_request: The user's request string
+        run_config: Optional RunConfig for customizing the run
+        hooks: Optional hooks for the run
+        
+    Returns:
+        The Code Agent output, an error string if the search or download did not finish,
+        or None if the Manager Agent should handle the request
+    """
+    # Requests about a local video need the Manager Agent's video lookup tools
+    if _VIDEO_FILE_RE.search(user_request):
+        return None
+    
+    try:
+        match = _URL_RE.search(user_request)
+        if match is None:
+            search_result = await cached_run(search_agent, user_request, run_config=run_config, hooks=hooks, max_turns=_SEARCH_MAX_TURNS)
+            search_output = search_result.final_output
+            # The Search Agent may already have handed off to the Code Agent
+            if isinstance(search_output, codeagentoutput):
+                return search_output
+            match = _URL_RE.search(str(search_output))
+            # Handing this to the Manager Agent would only repeat the same search
+            if match is None:
+                return f"Error: the Search Agent did not find a video to download.\n\n{search_output}"
+    except MaxTurnsExceeded:
+        return f"Error: the Search Agent did not finish within {_SEARCH_MAX_TURNS} turns."
+    
+    try:
+        code_request = f"Please download this video: {match.group(0)} and save it to the videos directory"
+        code_result = await cached_run(code_agent, code_request, run_config=run_config, hooks=hooks, max_turns=_CODE_MAX_TURNS)
+        return code_result.final_output
+    except MaxTurnsExceeded:
+        return f"Error: the Code Agent did not finish downloading {match.group(0)} within {_CODE_MAX_TURNS} turns."
+
+# Next workflow stage for each agent output type; a stage returns the next output or a final string
+_HANDLERS = {
+    codeagentoutput: _handle_code_output,
+    videounderstandingoutput: _handle_understanding,
+    videoeditingoutput: _handle_editing
+}
+
 # Function to process user requests
-async def process_request(user_request: str, run_config: Optional[RunConfig] = None, hooks = None) -> str:
+def _response_cache_path(user_request: str) -> str:
+    """
+    Get the cache file for a request's final response.
+    
+    Args:
+        user_request: The user's request string
+        
+    Returns:
+        Path of the cache file, keyed by the request and the models of all agents
+    """
+    models = "|".join(
+        f"{agent.name}={agent.model}"
+        for agent in (manager_agent, search_agent, code_agent, video_frames_agent, video_understanding_agent, video_editing_agent)
+    )
+    key = hashlib.blake2b(f"{user_request}\0{models}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(_RESPONSE_CACHE_DIR, f"{key}.json")
+
+def _read_cached_response(cache_path: str) -> Optional[str]:
+    """
+    Read a cached response if it has not expired.
+    
+    Args:
+        cache_path: Path from _response_cache_path
+        
+    Returns:
+        The cached response, or None if there is no fresh entry
+    """
+    try:
+        with open(cache_path, 'rb') as f:
+            if time.time() - os.fstat(f.fileno()).st_mtime > _RESPONSE_CACHE_TTL_SECONDS:
+                return None
+            return fast_json.loads(f.read()).get("response")
+    except (FileNotFoundError, fast_json.JSONDecodeError):
+        return None
+
+async def process_request(user_request: str, run_config: Optional[RunConfig] = None, hooks = None, use_cache: bool = True) -> str:
     """
     Process a user request to create a short video with key steps.
     
@@ -566,119 +1241,65 @@ async def process_request(user_request: str, run_config: Optional[RunConfig] = N
         user_request: The user's request string
         run_config: Optional RunConfig for customizing the run
         hooks: Optional hooks for the run
+        use_cache: Whether to reuse the response of an identical earlier request (default: True)
         
     Returns:
         A response string with the result of the processing
     """
+    cache_path = _response_cache_path(user_request) if use_cache else None
+    if cache_path is not None:
+        cached = _read_cached_response(cache_path)
+        if cached is not None:
+            print(f"Using cached response: {cache_path}")
+            return cached
+    
     with trace("Video Processing Workflow"):
-        # Run the manager agent to coordinate the workflow
-        manager_result = await Runner.run(manager_agent, user_request, run_config=run_config, hooks=hooks, max_turns=20)
+        # Search and download without the Manager Agent relaying the URL when possible
+        current = await _download_video_directly(user_request, run_config, hooks)
         
-        manager_output = manager_result.final_output
+        if current is None:
+            # Run the manager agent to coordinate the workflow; its workflow is search -> download -> done,
+            # so running out of turns means it is looping and should fail fast
+            try:
+                manager_result = await cached_run(manager_agent, user_request, run_config=run_config, hooks=hooks, max_turns=_MANAGER_MAX_TURNS)
+            except MaxTurnsExceeded:
+                return f"Error: the Manager Agent did not finish the search and download workflow within {_MANAGER_MAX_TURNS} turns."
+            current = manager_result.final_output
         
-        # Check if the output contains information about downloaded video/audio
-        if isinstance(manager_output, codeagentoutput):
-            # Try to extract audio path from the output
-            audio_path = manager_output.audio_path
-            video_path = manager_output.video_path
-            
-            if audio_path and os.path.exists(audio_path):
-                print(f"Found audio path in output: {audio_path}. Processing audio using direct API calls...")
-                
-                # Process audio using direct API calls
-                audio_result = await process_audio(audio_path)
-                
-                if "error" in audio_result:
-                    return f"{manager_output}\n\nAudio transcription failed: {audio_result['error']}"
-                
-                # Get the JSON path from the audio processing result
-                json_path = audio_result.get("json_path")
-                
-                # Only proceed with video understanding if not skipped
-                if json_path and os.path.exists(json_path) and video_path and os.path.exists(video_path):
-                    print(f"Found transcript JSON at {json_path}. Transferring to Video Understanding Agent...")
-                    
-                    # Transfer to Video Understanding Agent
-                    video_understanding_request = f"Please analyze this video: {video_path} and use the transcript data from {json_path} to extract key frames and summarize the process."
-                    
-                    video_understanding_result = await Runner.run(
-                        video_understanding_agent, 
-                        video_understanding_request, 
-                        run_config=run_config, 
-                        hooks=hooks, 
-                        max_turns=10
-                    )
-                    
-                    video_understanding_output = video_understanding_result.final_output
-                    
-                    if isinstance(video_understanding_output, videounderstandingoutput):
-                        # Format the key steps
-                        key_steps_text = ""
-                        key_steps_list = []
-                        
-                        if video_understanding_output.key_steps:
-                            for i, step in enumerate(video_understanding_output.key_steps):
-                                step_text = step.get('description', 'Step')
-                                key_steps_text += f"\n{i+1}. {step_text}"
-                                
-                                if 'timestamp' in step:
-                                    key_steps_text += f" (at {step['timestamp']})"
-                                    step_text += f" (at {step['timestamp']})"
-                                
-                                if 'frame' in step:
-                                    key_steps_text += f" - Frame: {step['frame']}"
-                                
-                                key_steps_list.append(step_text)
-                        else:
-                            key_steps_text = "\n(No key steps identified)"
-                        
-                        # Transfer to Video Editing Agent
-                        if video_understanding_output.frames_dir and os.path.exists(video_understanding_output.frames_dir):
-                            print(f"Found frames directory at {video_understanding_output.frames_dir}. Transferring to Video Editing Agent...")
-                            
-                            # Format key steps for the Video Editing Agent
-                            formatted_key_steps = ", ".join([f'"{step}"' for step in key_steps_list])
-                            
-                            # Transfer to Video Editing Agent
-                            video_editing_request = f"Please create a short video from the frames in {video_understanding_output.frames_dir} with the following key steps: [{formatted_key_steps}]. The summary of the video is: {video_understanding_output.summary}"
-                            
-                            video_editing_result = await Runner.run(
-                                video_editing_agent, 
-                                video_editing_request, 
-                                run_config=run_config, 
-                                hooks=hooks, 
-                                max_turns=10
-                            )
-                            
-                            video_editing_output = video_editing_result.final_output
-                            
-                            if isinstance(video_editing_output, videoeditingoutput):
-                                final_output = f"Video Creation Summary:\n\n" \
-                                              f"Created a short video highlighting the key steps.\n" \
-                                              f"Output video: {video_editing_output.output_video_path}\n" \
-                                              f"Duration: {video_editing_output.duration} seconds\n" \
-                                              f"Frame count: {video_editing_output.frame_count}\n\n" \
-                                              f"Video Analysis Summary:\n\n{video_understanding_output.summary}\n\n" \
-                                              f"Key Steps:{key_steps_text}\n\n" \
-                                              f"Frames extracted to: {video_understanding_output.frames_dir}"
-                                return final_output
-                        
-                        # If we couldn't process with the Video Editing Agent, return the Video Understanding Agent results
-                        final_output = f"Video Analysis Summary:\n\n{video_understanding_output.summary}\n\nKey Steps:{key_steps_text}\n\nFrames extracted to: {video_understanding_output.frames_dir}"
-                        return final_output
-                
-                # If we couldn't process with the Video Understanding Agent or it was skipped, return the audio processing results
-                transcript = audio_result["transcript"]
-                key_points = audio_result["key_points"]
-                
-                key_points_text = "\n".join([f"- {point}" for point in key_points])
-                
-                final_output = f"{manager_output}\n\n--- TRANSCRIPT ---\n{transcript}\n\n--- KEY POINTS ---\n{key_points_text}"
-                
-                return final_output
+        # Advance through the stages until one produces the final response
+        ctx = {"run_config": run_config, "hooks": hooks}
+        while type(current) in _HANDLERS:
+            current = await _HANDLERS[type(current)](current, ctx)
         
-        # If we couldn't extract audio path or process it, just return the original output
-        return str(manager_output)
+        response = str(current)
+        # Only a request that made it through editing is replayed; every earlier stop is a failure or partial result
+        if cache_path is not None and ctx.get("complete"):
+            try:
+                os.makedirs(_RESPONSE_CACHE_DIR, exist_ok=True)
+                await asyncio.to_thread(write_file_atomic, cache_path, fast_json.dumps({"request": user_request, "response": response}))
+            except OSError as e:
+                print(f"Could not cache response: {e}")
+        return response
+
+async def _warm() -> None:
+    """
+    Pay one-time startup costs in the background while the first agent runs:
+    open the OpenAI connection pool and probe the hardware H.264 encoder.
+    """
+    async def open_connection() -> None:
+        await get_async_openai_client().models.retrieve("whisper-1")
+    
+    results = await asyncio.gather(
+        open_connection(),
+        asyncio.to_thread(detect_h264_encoder),
+        return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"Warm-up step failed (ignored): {result}")
+
+# Longer responses are truncated in the live display and printed in full afterwards
+_RESPONSE_PREVIEW_CHARS = 2000
 
 async def main():
     parser = argparse.ArgumentParser(description="Video Agent - Extract key steps from cooking videos")
@@ -687,8 +1308,14 @@ async def main():
     parser.add_argument("--max-duration", type=int, default=300, help="Maximum duration of the output video in seconds")
     parser.add_argument("--no-pretty", action="store_true", 
                         help="Disable pretty printing and use simple console output")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Run the whole pipeline again instead of reusing cached responses, agent outputs and transcripts")
     args = parser.parse_args()
     
+    if args.no_cache:
+        os.environ["DISABLE_AGENT_CACHE"] = "1"
+        os.environ["DISABLE_TRANSCRIPT_CACHE"] = "1"
+    
     user_request = "I want to see the key steps of how play squash in a short video, " \
                       "find a video for me (max duration 5 minutes) and download it and then teach me how to do it, give me the key steps short video back."
     
@@ -700,14 +1327,25 @@ async def main():
         workflow_name="Video Processing Workflow"
     )
     
+    # Warm up connections and caches while the Manager Agent runs
+    warm_task = asyncio.create_task(_warm()) if os.getenv("WARM_ON_START", "1") == "1" else None
+    
     try:
         # Process the request with the run config
         printer.update_item("request", f"Processing request: {user_request}", category="system")
-        response = await process_request(user_request, run_config, hooks=hooks)
-        printer.update_item("response", f"Response: {response}", is_done=True, category="system")
+        response = await process_request(user_request, run_config, hooks=hooks, use_cache=not args.no_cache)
+        # The panel only shows the start of the response; the full text is printed once the display stops
+        response = str(response)
+        preview = response if len(response) <= _RESPONSE_PREVIEW_CHARS else response[:_RESPONSE_PREVIEW_CHARS - 3] + "..."
+        printer.update_item("response", f"Response: {preview}", is_done=True, category="system")
     finally:
+        if warm_task is not None and not warm_task.done():
+            warm_task.cancel()
         # Clean up the printer
         cleanup()
+    
+    if len(response) > _RESPONSE_PREVIEW_CHARS:
+        print(response)
 
 
 if __name__ == "__main__":
@@ -6,104 +6,449 @@ The Code Agent can use this as a reference when generating code.
 """
 
 import os
+import time
+import asyncio
+import argparse
+import functools
+import hashlib
 import subprocess
+import tempfile
 import json
 import re
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 
-def download_video(
-    video_url: str, 
-    output_dir: str = "videos",
-    video_title: Optional[str] = None,
-    max_height: int = 720
-) -> Dict[str, Any]:
+# orjson parses the metadata JSON faster; the standard library also accepts bytes, just more slowly
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Results of earlier downloads, so re-running on the same video skips yt-dlp entirely
+_META_CACHE_DIR = os.path.join(".cache", "yt_meta")
+_META_CACHE_TTL_SECONDS = 86400
+
+# Progress lines printed by yt-dlp with _PROGRESS_ARGS, e.g. "PROGRESS  42.5%"; the "download:" prefix
+# only selects the template type and is not printed, so the lines carry a tag of their own
+_PROGRESS_ARGS = ["--newline", "--progress", "--progress-template", "download:PROGRESS %(progress._percent_str)s"]
+_PROGRESS_RE = re.compile(rb'^PROGRESS\s+([\d.]+)%')
+
+# Line length limit for reading yt-dlp's output asynchronously; the metadata JSON line of a video
+# with many formats is far longer than asyncio's 64 KiB default
+_STREAM_LIMIT = 32 * 1024 * 1024
+
+# Environment for yt-dlp, built once; unbuffered output lets progress lines arrive as they happen
+_YTDLP_ENV = {**os.environ, "PYTHONUNBUFFERED": "1"}
+
+# Audio extracted alongside the video: 16 kHz mono WAV, the input format Whisper expects;
+# -k keeps the video, which yt-dlp would otherwise delete after extracting the audio
+_EXTRACT_AUDIO_ARGS = ["-x", "--audio-format", "wav", "--postprocessor-args", "ExtractAudio:-ac 1 -ar 16000", "-k"]
+
+# Characters not allowed in file titles; \w keeps the same Unicode letters and digits as str.isalnum
+_SAFE_TITLE_RE = re.compile(r'[^\w.\- ]+')
+
+# File name of an untitled YouTube download; the batch download fills in the ID with a yt-dlp field
+_YOUTUBE_TITLE = "youtube_{}"
+
+_YOUTUBE_RE = re.compile(r'(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})')
+
+@functools.lru_cache(maxsize=64)
+def _ensure_dir(path: str) -> str:
+    """Create a directory once per process and return its absolute path"""
+    os.makedirs(path, exist_ok=True)
+    return os.path.abspath(path)
+
+def _default_title(video_url: str, youtube_id: Optional[str]) -> str:
     """
-    Download a video from a URL using yt-dlp.
+    Name the file of a download that was not given a title.
+    
+    Args:
+        video_url: The URL of the video
+        youtube_id: YouTube video ID, if the URL is a YouTube URL
+        
+    Returns:
+        "youtube_<id>" for a YouTube video, otherwise "video_" and a digest of the URL
+    """
+    if youtube_id:
+        return _YOUTUBE_TITLE.format(youtube_id)
+    # The digest is stable across runs (unlike hash(), which is randomized per process), so the metadata cache key is too
+    return f"video_{hashlib.sha1(video_url.encode('utf-8')).hexdigest()[:8]}"
+
+def _prepare_download(
+    video_url: str,
+    output_dir: str,
+    video_title: Optional[str],
+    max_height: int,
+    extract_audio: bool = False
+) -> Tuple[Optional[str], str, List[str]]:
+    """
+    Build the yt-dlp command for a download.
     
     Args:
         video_url: The URL of the video to download
-        output_dir: Directory to save the video (default: "videos")
+        output_dir: Directory to save the video
         video_title: Optional title to use for the saved file
-        max_height: Maximum height of the video in pixels (default: 720)
+        max_height: Maximum height of the video in pixels
+        extract_audio: Whether yt-dlp should also save the audio as WAV next to the video
         
     Returns:
-        Dictionary with information about the downloaded video
+        Tuple of (YouTube video ID or None, metadata cache key, yt-dlp command)
     """
     # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
+    output_dir = _ensure_dir(output_dir)
+    
+    # Extract video ID from URL if it's a YouTube URL
+    match = _YOUTUBE_RE.search(video_url)
+    youtube_id = match.group(1) if match else None
     
     # Generate a filename from the URL if title is not provided
     if not video_title:
-        # Extract video ID from URL if it's a YouTube URL
-        youtube_pattern = r'(?:youtube\.com\/(?:[^\/\n\s]+\/\S+\/|(?:v|e(?:mbed)?)\/|\S*?[?&]v=)|youtu\.be\/)([a-zA-Z0-9_-]{11})'
-        match = re.search(youtube_pattern, video_url)
-        if match:
-            video_id = match.group(1)
-            video_title = f"youtube_{video_id}"
-        else:
-            # Use a hash of the URL as the filename
-            video_title = f"video_{hash(video_url) % 10000}"
+        video_title = _default_title(video_url, youtube_id)
     
     # Clean the filename (remove special characters)
-    video_title = "".join(c for c in video_title if c.isalnum() or c in "._- ").strip()
+    video_title = _SAFE_TITLE_RE.sub("", video_title).strip()
     if not video_title:
-        video_title = f"video_{hash(video_url) % 10000}"
+        video_title = _default_title(video_url, youtube_id)
     
     # Full path to save the video (without extension, yt-dlp will add it)
     output_template = os.path.join(output_dir, video_title)
     
+    # Download the video and print its metadata and final path from the same yt-dlp process;
+    # --print implies --simulate, so --no-simulate is needed for the download to happen
+    cmd = [
+        "yt-dlp",
+        "-f", f"best[height<={max_height}]",
+        "-o", f"{output_template}.%(ext)s",
+        "--restrict-filenames",
+        "--no-simulate",
+        "--print", "video:%()j",
+        "--print", "after_move:PATH %(filepath)s"
+    ]
+    if extract_audio:
+        # After extraction the final path is the audio file, so also print the video's path before downloading
+        cmd += _EXTRACT_AUDIO_ARGS + ["--print", "before_dl:VIDEO %(filename)s"]
+    cmd.append(video_url)
+    
+    # Key on the video ID rather than the URL so extra URL parameters still hit the cache
+    cache_source = f"{youtube_id or video_url}|{output_template}|{max_height}|{extract_audio}"
+    cache_key = hashlib.sha256(cache_source.encode("utf-8")).hexdigest()
+    return youtube_id, cache_key, cmd
+
+def _read_cached_download(cache_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up an earlier download of the same video to the same place.
+    
+    Args:
+        cache_key: Metadata cache key from _prepare_download
+        
+    Returns:
+        The cached result if it is fresh and the video file is still there, None otherwise
+    """
+    cache_path = os.path.join(_META_CACHE_DIR, f"{cache_key}.json")
     try:
-        # Check if video exists before downloading (for YouTube videos)
-        youtube_id = None
-        match = re.search(youtube_pattern, video_url)
-        if match:
-            youtube_id = match.group(1)
-            check_cmd = ["yt-dlp", "--skip-download", "--playlist-items", "1", f"https://www.youtube.com/watch?v={youtube_id}"]
-            try:
-                subprocess.run(check_cmd, check=True, capture_output=True, text=True)
-            except subprocess.CalledProcessError:
-                return {
-                    "status": "error",
-                    "message": f"Video unavailable or has been removed: {video_url}",
-                    "error": "Video unavailable"
-                }
-        
-        # Download the video using yt-dlp
-        cmd = [
-            "yt-dlp",
-            "-f", f"best[height<={max_height}]",
-            "-o", f"{output_template}.%(ext)s",
-            "--restrict-filenames",
-            "--print", "filename",
-            video_url
-        ]
-        
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        downloaded_file = result.stdout.strip()
-        
-        # Get video info
-        info_cmd = ["yt-dlp", "--dump-json", video_url]
-        info_result = subprocess.run(info_cmd, check=True, capture_output=True, text=True)
-        video_info = json.loads(info_result.stdout)
+        if time.time() - os.stat(cache_path).st_mtime > _META_CACHE_TTL_SECONDS:
+            return None
+        with open(cache_path, "rb") as f:
+            result = _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+    
+    if not os.path.isfile(result.get("video_path") or ""):
+        return None
+    if "audio_path" in result and not os.path.isfile(result["audio_path"]):
+        return None
+    result["message"] = "Video already downloaded (cached)"
+    return result
+
+def _write_cached_download(cache_key: str, result: Dict[str, Any]) -> None:
+    """
+    Remember a successful download; failures to write the cache are ignored.
+    
+    Args:
+        cache_key: Metadata cache key from _prepare_download
+        result: Success result of the download
+    """
+    try:
+        os.makedirs(_META_CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(_META_CACHE_DIR, f"{cache_key}.json")
+        with open(cache_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        pass
+
+def _download_result(video_url: str, stdout: bytes, extract_audio: bool = False) -> Dict[str, Any]:
+    """
+    Build the success result from the output of a yt-dlp download.
+    
+    Args:
+        video_url: The URL of the downloaded video
+        stdout: Raw standard output of the yt-dlp process
+        extract_audio: Whether the audio was extracted to a WAV file next to the video
         
+    Returns:
+        Dictionary with information about the downloaded video
+    """
+    # The metadata is printed as one JSON line and the paths as tagged lines: PATH is the final file
+    # (the audio when it was extracted), VIDEO the video file before extraction; other lines are ignored.
+    # The JSON parser reads the bytes directly, so only the paths are decoded
+    video_info = {}
+    final_path = video_path = b""
+    for line in stdout.splitlines():
+        if line.startswith(b"{"):
+            video_info = _json_loads(line)
+        elif line.startswith(b"PATH "):
+            final_path = line[5:].strip()
+        elif line.startswith(b"VIDEO "):
+            video_path = line[6:].strip()
+    final_path = final_path.decode("utf-8", errors="replace")
+    downloaded_file = video_path.decode("utf-8", errors="replace") if extract_audio else final_path
+    
+    result = {
+        "status": "success",
+        "message": "Video downloaded successfully",
+        "video_path": downloaded_file,
+        "video_title": os.path.basename(downloaded_file),
+        "source_url": video_url,
+        "duration": video_info.get("duration"),
+        "title": video_info.get("title"),
+        "uploader": video_info.get("uploader"),
+        "view_count": video_info.get("view_count", 0)
+    }
+    if extract_audio:
+        result["audio_path"] = final_path
+    return result
+
+def _download_error(video_url: str, youtube_id: Optional[str], stderr: str, error: str) -> Dict[str, Any]:
+    """
+    Build the error result for a failed yt-dlp download.
+    
+    Args:
+        video_url: The URL of the video
+        youtube_id: YouTube video ID, if the URL is a YouTube URL
+        stderr: Standard error of the yt-dlp process
+        error: Description of the failure
+        
+    Returns:
+        Dictionary describing the error
+    """
+    # A failed YouTube download is usually an unavailable or removed video
+    if youtube_id and "unavailable" in (stderr or "").lower():
         return {
-            "status": "success",
-            "message": "Video downloaded successfully",
-            "video_path": downloaded_file,
-            "video_title": os.path.basename(downloaded_file),
-            "source_url": video_url,
-            "duration": video_info.get("duration"),
-            "title": video_info.get("title"),
-            "uploader": video_info.get("uploader"),
-            "view_count": video_info.get("view_count", 0)
+            "status": "error",
+            "message": f"Video unavailable or has been removed: {video_url}",
+            "error": "Video unavailable"
         }
-    except subprocess.CalledProcessError as e:
+    return {
+        "status": "error",
+        "message": f"Failed to download video: {stderr}",
+        "error": error,
+        "command_output": stderr
+    }
+
+def _parse_progress(line: bytes) -> Optional[float]:
+    """
+    Read the percentage from a yt-dlp progress line.
+    
+    Args:
+        line: A line of yt-dlp's standard output
+        
+    Returns:
+        The percentage, or None if the line is not a progress line
+    """
+    match = _PROGRESS_RE.match(line)
+    return float(match.group(1)) if match else None
+
+def _run_with_progress(cmd: List[str], video_url: str, printer: Optional[Any]) -> Tuple[int, bytes, bytes]:
+    """
+    Run a yt-dlp download, reporting its progress to the printer as it happens.
+    
+    Args:
+        cmd: yt-dlp command from _prepare_download
+        video_url: The URL of the video, shown in the progress bar
+        printer: Object with start_download/update_download methods (e.g. VideoPrinter), or None
+        
+    Returns:
+        Tuple of (exit status, raw standard output without the progress lines, raw standard error)
+    """
+    # Stderr goes to a file so a flood of warnings cannot fill its pipe while stdout is being read
+    stderr_file = tempfile.TemporaryFile()
+    process = subprocess.Popen(
+        cmd[:-1] + _PROGRESS_ARGS + cmd[-1:],
+        stdout=subprocess.PIPE,
+        stderr=stderr_file,
+        env=_YTDLP_ENV
+    )
+    try:
+        if printer is not None:
+            # The bar counts percent, so its total is 100
+            printer.start_download(video_url, 100.0)
+        
+        output_lines = []
+        last_percent = 0.0
+        for line in process.stdout:
+            percent = _parse_progress(line)
+            if percent is None:
+                output_lines.append(line)
+                continue
+            
+            # Merged formats download in several parts, so the percentage can start over
+            if printer is not None and percent > last_percent:
+                printer.update_download(advance=percent - last_percent, percentage=percent)
+                last_percent = percent
+        
+        returncode = process.wait()
+        stderr_file.seek(0)
+        return returncode, b"".join(output_lines), stderr_file.read()
+    finally:
+        # Stop yt-dlp if we are interrupted before it finished
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        stderr_file.close()
+
+async def _run_with_progress_async(cmd: List[str], video_url: str, printer: Optional[Any]) -> Tuple[int, bytes, bytes]:
+    """
+    Run a yt-dlp download without blocking the event loop, reporting its progress to the printer.
+    
+    Args:
+        cmd: yt-dlp command from _prepare_download
+        video_url: The URL of the video, shown in the progress bar
+        printer: Object with start_download/update_download methods (e.g. VideoPrinter), or None
+        
+    Returns:
+        Tuple of (exit status, raw standard output without the progress lines, raw standard error)
+    """
+    process = await asyncio.create_subprocess_exec(
+        *(cmd[:-1] + _PROGRESS_ARGS + cmd[-1:]),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env=_YTDLP_ENV,
+        limit=_STREAM_LIMIT
+    )
+    # Stderr is read alongside stdout so a flood of warnings cannot fill its pipe
+    stderr_task = asyncio.ensure_future(process.stderr.read())
+    try:
+        if printer is not None:
+            # The bar counts percent, so its total is 100
+            printer.start_download(video_url, 100.0)
+        
+        output_lines = []
+        last_percent = 0.0
+        async for line in process.stdout:
+            percent = _parse_progress(line)
+            if percent is None:
+                output_lines.append(line)
+                continue
+            
+            # Merged formats download in several parts, so the percentage can start over
+            if printer is not None and percent > last_percent:
+                printer.update_download(advance=percent - last_percent, percentage=percent)
+                last_percent = percent
+        
+        returncode = await process.wait()
+        return returncode, b"".join(output_lines), await stderr_task
+    finally:
+        # Stop yt-dlp if we are interrupted before it finished
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_task.cancel()
+
+def download_video(
+    video_url: str, 
+    output_dir: str = "videos",
+    video_title: Optional[str] = None,
+    max_height: int = 720,
+    use_cache: bool = True,
+    printer: Optional[Any] = None,
+    extract_audio: bool = False
+) -> Dict[str, Any]:
+    """
+    Download a video from a URL using yt-dlp.
+    
+    Args:
+        video_url: The URL of the video to download
+        output_dir: Directory to save the video (default: "videos")
+        video_title: Optional title to use for the saved file
+        max_height: Maximum height of the video in pixels (default: 720)
+        use_cache: Whether to reuse an earlier download of the same video (default: True)
+        printer: Optional VideoPrinter (or any object with the same download methods) to show progress on
+        extract_audio: Whether to also save the audio as 16 kHz mono WAV, returned as audio_path (default: False)
+        
+    Returns:
+        Dictionary with information about the downloaded video
+    """
+    try:
+        youtube_id, cache_key, cmd = _prepare_download(video_url, output_dir, video_title, max_height, extract_audio)
+        cached = _read_cached_download(cache_key) if use_cache else None
+        if cached is not None:
+            return cached
+        
+        download_result = None
+        try:
+            returncode, stdout, stderr = _run_with_progress(cmd, video_url, printer)
+            if returncode != 0:
+                stderr_text = stderr.decode("utf-8", errors="replace")
+                return _download_error(video_url, youtube_id, stderr_text, f"yt-dlp exited with status {returncode}")
+            download_result = _download_result(video_url, stdout, extract_audio)
+            _write_cached_download(cache_key, download_result)
+            return download_result
+        finally:
+            # Also on failure, so the progress bar does not stay in the display
+            if printer is not None:
+                printer.complete_download(download_result["video_path"] if download_result else None)
+    except Exception as e:
         return {
             "status": "error",
-            "message": f"Failed to download video: {e.stderr}",
-            "error": str(e),
-            "command_output": e.stderr
+            "message": f"Failed to download video: {str(e)}",
+            "error": str(e)
         }
+
+async def download_video_async(
+    video_url: str, 
+    output_dir: str = "videos",
+    video_title: Optional[str] = None,
+    max_height: int = 720,
+    use_cache: bool = True,
+    printer: Optional[Any] = None,
+    extract_audio: bool = False
+) -> Dict[str, Any]:
+    """
+    Download a video from a URL using yt-dlp without blocking the event loop.
+    
+    Args:
+        video_url: The URL of the video to download
+        output_dir: Directory to save the video (default: "videos")
+        video_title: Optional title to use for the saved file
+        max_height: Maximum height of the video in pixels (default: 720)
+        use_cache: Whether to reuse an earlier download of the same video (default: True)
+        printer: Optional VideoPrinter (or any object with the same download methods) to show progress on
+        extract_audio: Whether to also save the audio as 16 kHz mono WAV, returned as audio_path (default: False)
+        
+    Returns:
+        Dictionary with information about the downloaded video
+    """
+    try:
+        youtube_id, cache_key, cmd = _prepare_download(video_url, output_dir, video_title, max_height, extract_audio)
+        cached = _read_cached_download(cache_key) if use_cache else None
+        if cached is not None:
+            return cached
+        
+        download_result = None
+        try:
+            returncode, stdout, stderr = await _run_with_progress_async(cmd, video_url, printer)
+            if returncode != 0:
+                stderr_text = stderr.decode("utf-8", errors="replace")
+                return _download_error(video_url, youtube_id, stderr_text, f"yt-dlp exited with status {returncode}")
+            download_result = _download_result(video_url, stdout, extract_audio)
+            _write_cached_download(cache_key, download_result)
+            return download_result
+        finally:
+            # Also on failure, so the progress bar does not stay in the display
+            if printer is not None:
+                printer.complete_download(download_result["video_path"] if download_result else None)
     except Exception as e:
         return {
             "status": "error",
@@ -111,13 +456,157 @@ def download_video(
             "error": str(e)
         }
 
+def download_videos(
+    video_urls: List[str],
+    output_dir: str = "videos",
+    max_height: int = 720,
+    use_cache: bool = True,
+    extract_audio: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Download several videos, with a single yt-dlp process for all YouTube videos to pay its startup cost once.
+    
+    Files get the same names as with download_video. Names of other videos come from a digest of
+    their URL, which a shared yt-dlp output template cannot express, so they are downloaded one by one.
+    
+    Args:
+        video_urls: The URLs of the videos to download
+        output_dir: Directory to save the videos (default: "videos")
+        max_height: Maximum height of the videos in pixels (default: 720)
+        use_cache: Whether to reuse earlier downloads of the same videos (default: True)
+        extract_audio: Whether to also save each video's audio as 16 kHz mono WAV (default: False)
+        
+    Returns:
+        One result dictionary per URL, in the same order; a failed download does not affect the others
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, Tuple[Optional[str], str]] = {}  # url -> (YouTube video ID, metadata cache key)
+    try:
+        for video_url in video_urls:
+            youtube_id, cache_key, _ = _prepare_download(video_url, output_dir, None, max_height, extract_audio)
+            cached = _read_cached_download(cache_key) if use_cache else None
+            if cached is not None:
+                results[video_url] = cached
+            elif youtube_id is None:
+                results[video_url] = download_video(video_url, output_dir, None, max_height, use_cache=False, extract_audio=extract_audio)
+                results[video_url].setdefault("source_url", video_url)
+            else:
+                pending[video_url] = (youtube_id, cache_key)
+        
+        if pending:
+            # Every line is tagged with the URL it was given as, so output maps back to the input;
+            # yt-dlp carries on with the next URL when one fails
+            cmd = [
+                "yt-dlp",
+                "-f", f"best[height<={max_height}]",
+                "-o", os.path.join(_ensure_dir(output_dir), _YOUTUBE_TITLE.format("%(id)s") + ".%(ext)s"),
+                "--restrict-filenames",
+                "--no-simulate",
+                "--print", "video:%()j",
+                "--print", "after_move:PATH\t%(original_url)s\t%(filepath)s",
+                "-a", "-"
+            ]
+            if extract_audio:
+                # After extraction the final path is the audio file, so take the video's path from before the download
+                cmd[-2:-2] = _EXTRACT_AUDIO_ARGS + ["--print", "before_dl:VIDEO\t%(original_url)s\t%(filename)s"]
+            
+            process = subprocess.run(
+                cmd,
+                input="".join(f"{url}\n" for url in pending).encode("utf-8"),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=_YTDLP_ENV
+            )
+            
+            # Regroup the output per URL in the single-download format that _download_result reads
+            video_lines: Dict[str, List[bytes]] = {}
+            done = set()
+            for line in process.stdout.splitlines():
+                if line.startswith(b"{"):
+                    url = _json_loads(line).get("original_url")
+                    if url:
+                        video_lines.setdefault(url, []).append(line)
+                    continue
+                
+                tag, _, rest = line.partition(b"\t")
+                url_bytes, _, path = rest.partition(b"\t")
+                if tag not in (b"PATH", b"VIDEO"):
+                    continue
+                url = url_bytes.decode("utf-8", errors="replace")
+                video_lines.setdefault(url, []).append(tag + b" " + path)
+                if tag == b"PATH":
+                    done.add(url)
+            
+            stderr = process.stderr.decode("utf-8", errors="replace")
+            for video_url, (youtube_id, cache_key) in pending.items():
+                if video_url in done:
+                    stdout = b"\n".join(video_lines[video_url])
+                    results[video_url] = _download_result(video_url, stdout, extract_audio)
+                    _write_cached_download(cache_key, results[video_url])
+                else:
+                    # Errors mention the video's ID, so other videos' errors are left out
+                    own_errors = "\n".join(line for line in stderr.splitlines() if youtube_id in line)
+                    results[video_url] = _download_error(
+                        video_url, youtube_id, own_errors or "yt-dlp did not download this video",
+                        f"yt-dlp exited with status {process.returncode}"
+                    )
+                    results[video_url]["source_url"] = video_url
+    except Exception as e:
+        for video_url in video_urls:
+            results.setdefault(video_url, {
+                "status": "error",
+                "message": f"Failed to download video: {str(e)}",
+                "error": str(e),
+                "source_url": video_url
+            })
+    
+    return [results[video_url] for video_url in video_urls]
+
+async def download_many(
+    video_urls: List[str],
+    max_concurrent: int = 5,
+    **download_options: Any
+) -> List[Dict[str, Any]]:
+    """
+    Download several videos concurrently.
+    
+    Args:
+        video_urls: The URLs of the videos to download
+        max_concurrent: Maximum number of downloads running at once (default: 5)
+        **download_options: Extra arguments for download_video_async (output_dir, max_height, use_cache, printer, extract_audio)
+        
+    Returns:
+        One result dictionary per URL, in the same order; a failed download does not affect the others
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def download_one(video_url: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await download_video_async(video_url, **download_options)
+    
+    results = await asyncio.gather(*(download_one(url) for url in video_urls), return_exceptions=True)
+    return [
+        result if not isinstance(result, BaseException) else {
+            "status": "error",
+            "message": f"Failed to download video: {result}",
+            "error": str(result),
+            "source_url": url
+        }
+        for url, result in zip(video_urls, results)
+    ]
+
 # Example usage:
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download a video with yt-dlp")
+    parser.add_argument("--no-cache", action="store_true", help="Download again even if the video was downloaded before")
+    args = parser.parse_args()
+    
     # Download a video
     result = download_video(
         video_url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",
         output_dir="videos",
-        max_height=720
+        max_height=720,
+        use_cache=not args.no_cache
     )
     
     # Print the result
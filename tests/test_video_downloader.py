@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "templates"))
+
+import video_downloader
+
+# Output of yt-dlp 2026.08.19 run with the template's _PROGRESS_ARGS and --print options
+_YTDLP_STDOUT = (
+    b'{"id": "clip", "title": "clip", "uploader": null, "duration": null}\n'
+    b"PROGRESS   0.0%\n"
+    b"PROGRESS  17.4%\n"
+    b"PROGRESS 100.0%\n"
+    b"PROGRESS 100.0%\n"
+    b"PATH /tmp/videos/clip.mp4\n"
+)
+
+class ProgressParsingTest(unittest.TestCase):
+    def test_parses_real_progress_lines(self):
+        lines = _YTDLP_STDOUT.splitlines(keepends=True)
+        percents = [video_downloader._parse_progress(line) for line in lines]
+        self.assertEqual(percents, [None, 0.0, 17.4, 100.0, 100.0, None])
+
+    def test_ignores_default_progress_lines(self):
+        self.assertIsNone(video_downloader._parse_progress(b"[download]  42.5% of 10.00MiB at 1.00MiB/s ETA 00:05\n"))
+        self.assertIsNone(video_downloader._parse_progress(b"PROGRESS Unknown %\n"))
+
+class DownloadResultTest(unittest.TestCase):
+    def test_reads_tagged_path(self):
+        result = video_downloader._download_result("http://example.com/clip.mp4", _YTDLP_STDOUT)
+        self.assertEqual(result["video_path"], "/tmp/videos/clip.mp4")
+        self.assertEqual(result["title"], "clip")
+        self.assertNotIn("audio_path", result)
+
+    def test_extract_audio_paths_ignore_progress_lines(self):
+        stdout = (
+            b'{"id": "clip", "title": "clip"}\n'
+            b"VIDEO /tmp/videos/clip.mp4\n"
+            b"PROGRESS  50.0%\n"
+            b"PROGRESS 100.0%\n"
+            b"PATH /tmp/videos/clip.wav\n"
+        )
+        result = video_downloader._download_result("http://example.com/clip.mp4", stdout, extract_audio=True)
+        self.assertEqual(result["video_path"], "/tmp/videos/clip.mp4")
+        self.assertEqual(result["audio_path"], "/tmp/videos/clip.wav")
+
+if __name__ == "__main__":
+    unittest.main()
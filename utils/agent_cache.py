@@ -0,0 +1,156 @@
+"""
+Response cache for agent runs.
+
+Final outputs are keyed by a SHA-256 of the agent name, model and prompt and
+persisted to a SQLite file so hits survive restarts. Entries expire after a
+week, failed outputs are never stored, and an output that names files or
+directories is only replayed while they still exist.
+Set DISABLE_AGENT_CACHE=1 to always run the agent.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import importlib
+import functools
+from typing import Any, Optional, Tuple
+from agents import Agent, Runner, RunConfig
+from utils import fast_json
+
+_CACHE_PATH = os.environ.get("AGENT_CACHE_PATH", os.path.join(".cache", "agent_cache.sqlite3"))
+_CACHE_TTL_SECONDS = 7 * 86400
+
+# Free-text outputs that report a failure rather than a result
+_FAILURE_PREFIXES = ("error", "failed", "unable", "sorry", "i could not", "i couldn't")
+
+class CachedRunResult:
+    """
+    Stand-in for a RunResult replayed from the cache; only final_output is restored.
+    """
+    
+    def __init__(self, final_output: Any):
+        self.final_output = final_output
+
+@functools.lru_cache(maxsize=1)
+def _connection() -> sqlite3.Connection:
+    """Open the cache database once, creating the table on first use"""
+    cache_dir = os.path.dirname(_CACHE_PATH)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    conn = sqlite3.connect(_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses ("
+        "key TEXT PRIMARY KEY, agent TEXT, model TEXT, "
+        "output_type TEXT, value TEXT, created_at REAL)"
+    )
+    return conn
+
+def _cache_key(agent: Agent, prompt: str) -> str:
+    return hashlib.sha256(f"{agent.name}\0{agent.model}\0{prompt}".encode("utf-8")).hexdigest()
+
+def _serialize(final_output: Any) -> Tuple[str, str]:
+    """Return the output's type path and its JSON representation"""
+    output_cls = type(final_output)
+    type_path = f"{output_cls.__module__}:{output_cls.__qualname__}"
+    if hasattr(final_output, "model_dump_json"):
+        return type_path, final_output.model_dump_json()
+    return type_path, fast_json.dumps(final_output).decode("utf-8")
+
+def _deserialize(type_path: str, value: str) -> Any:
+    """Rebuild a cached output, validating pydantic models against their class"""
+    module_name, qualname = type_path.split(":", 1)
+    output_cls = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        output_cls = getattr(output_cls, attr)
+    if hasattr(output_cls, "model_validate_json"):
+        return output_cls.model_validate_json(value)
+    return fast_json.loads(value)
+
+def _is_failure(final_output: Any) -> bool:
+    """
+    Tell whether an output reports a failure and should not be cached.
+    
+    Args:
+        final_output: Final output of an agent run
+    
+    Returns:
+        True for error strings, and for models with a false *_exists flag or an empty path
+    """
+    if isinstance(final_output, str):
+        return final_output.lstrip().lower().startswith(_FAILURE_PREFIXES)
+    if hasattr(final_output, "model_dump"):
+        for name, value in final_output.model_dump().items():
+            if name.endswith("_exists") and value is False:
+                return True
+            if name.endswith(("_path", "_dir")) and not value:
+                return True
+    return False
+
+def _files_exist(final_output: Any) -> bool:
+    """
+    Tell whether the files and directories an output refers to are still there.
+    
+    Args:
+        final_output: Output replayed from the cache
+    
+    Returns:
+        False if any *_path or *_dir field of a model names a missing path
+    """
+    if not hasattr(final_output, "model_dump"):
+        return True
+    return all(
+        os.path.exists(value)
+        for name, value in final_output.model_dump().items()
+        if name.endswith(("_path", "_dir")) and isinstance(value, str)
+    )
+
+async def cached_run(agent: Agent, prompt: str, *, run_config: Optional[RunConfig] = None, hooks = None, max_turns: int = 10) -> Any:
+    """
+    Run an agent, replaying a cached final output for an identical prompt.
+    
+    Args:
+        agent: Agent to run
+        prompt: Input prompt
+        run_config: Optional RunConfig for customizing the run
+        hooks: Optional hooks for the run
+        max_turns: Maximum number of turns for the run
+    
+    Returns:
+        The RunResult on a miss, or a CachedRunResult carrying final_output on a hit
+    """
+    if os.environ.get("DISABLE_AGENT_CACHE"):
+        return await Runner.run(agent, prompt, run_config=run_config, hooks=hooks, max_turns=max_turns)
+    
+    conn = _connection()
+    key = _cache_key(agent, prompt)
+    
+    row = conn.execute(
+        "SELECT output_type, value FROM responses WHERE key = ? AND created_at >= ?",
+        (key, time.time() - _CACHE_TTL_SECONDS)
+    ).fetchone()
+    if row is not None:
+        try:
+            final_output = _deserialize(*row)
+            # Outputs of downloads, frame extraction and editing are only valid while their files exist
+            if _files_exist(final_output):
+                print(f"Agent cache hit for {agent.name}")
+                return CachedRunResult(final_output)
+        except Exception as e:
+            print(f"Agent cache: ignoring unreadable entry for {agent.name}: {e}")
+    
+    result = await Runner.run(agent, prompt, run_config=run_config, hooks=hooks, max_turns=max_turns)
+    
+    if _is_failure(result.final_output):
+        return result
+    try:
+        output_type, value = _serialize(result.final_output)
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, agent, model, output_type, value, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, agent.name, str(agent.model), output_type, value, time.time())
+        )
+        conn.commit()
+    except Exception as e:
+        print(f"Agent cache: could not store result for {agent.name}: {e}")
+    
+    return result
@@ -1,3 +1,4 @@
+import itertools
 from typing import Dict, Any, Optional, List, Callable
 from agents import Agent, RunHooks, RunContextWrapper, RunItem, trace
 from .printer import VideoPrinter
@@ -17,35 +18,42 @@ class AgentPrinterHooks(RunHooks):
         """
         self.printer = printer
         self.current_agent: Optional[str] = None
+        # Printer item IDs of running tool calls, keyed by the identity of their input
+        self._tool_call_ids: Dict[int, str] = {}
+        self._next_id = itertools.count()
         
     async def on_run_begin(self, agent: Agent, context: RunContextWrapper, input_list: List[Dict[str, Any]]) -> None:
         """Called when an agent run begins"""
         self.current_agent = agent.name
-        self.printer.add_agent_message(agent.name, f"Starting processing")
+        await self.printer.post("add_agent_message", agent.name, "Starting processing")
         
     async def on_run_end(self, agent: Agent, context: RunContextWrapper, result: Any) -> None:
         """Called when an agent run ends"""
         if hasattr(result, 'final_output') and result.final_output:
+            # Structured outputs can carry whole transcripts, so only their start is shown
             output = result.final_output
-            if isinstance(output, str) and len(output) > 100:
+            if not isinstance(output, str):
+                output = str(output)
+            if len(output) > 100:
                 output = output[:97] + "..."
-            self.printer.add_agent_message(agent.name, f"Completed: {output}")
+            await self.printer.post("add_agent_message", agent.name, f"Completed: {output}")
         else:
-            self.printer.add_agent_message(agent.name, "Completed processing")
+            await self.printer.post("add_agent_message", agent.name, "Completed processing")
             
-        self.printer.mark_item_done(f"{agent.name}_processing")
+        await self.printer.post("mark_item_done", f"{agent.name}_processing")
         
     async def on_llm_begin(self, agent: Agent, context: RunContextWrapper, messages: List[Dict[str, Any]]) -> None:
         """Called when LLM processing begins"""
-        self.printer.update_item(
+        await self.printer.post(
+            "update_item",
             f"{agent.name}_llm",
             f"🤔 {agent.name} is thinking...",
-            category=agent.name.lower().replace(" ", "_")
+            category=self.printer.category_for(agent.name)
         )
         
     async def on_llm_end(self, agent: Agent, context: RunContextWrapper, response: Dict[str, Any]) -> None:
         """Called when LLM processing ends"""
-        self.printer.mark_item_done(f"{agent.name}_llm")
+        await self.printer.post("mark_item_done", f"{agent.name}_llm")
         
     async def on_tool_call_begin(self, agent: Agent, context: RunContextWrapper, tool_name: str, tool_input: Dict[str, Any]) -> None:
         """Called when a tool call begins"""
@@ -53,10 +61,13 @@ class AgentPrinterHooks(RunHooks):
         if len(input_str) > 50:
             input_str = input_str[:47] + "..."
             
-        self.printer.update_item(
-            f"{agent.name}_tool_{tool_name}_{hash(str(tool_input)) % 10000}",
+        item_id = f"{agent.name}_tool_{tool_name}_{next(self._next_id)}"
+        self._tool_call_ids[id(tool_input)] = item_id
+        await self.printer.post(
+            "update_item",
+            item_id,
             f"🔧 Using tool: {tool_name} with input: {input_str}",
-            category=agent.name.lower().replace(" ", "_")
+            category=self.printer.category_for(agent.name)
         )
         
     async def on_tool_call_end(self, agent: Agent, context: RunContextWrapper, tool_name: str, tool_input: Dict[str, Any], tool_output: Any) -> None:
@@ -65,15 +76,17 @@ class AgentPrinterHooks(RunHooks):
         if len(output_str) > 50:
             output_str = output_str[:47] + "..."
             
-        item_id = f"{agent.name}_tool_{tool_name}_{hash(str(tool_input)) % 10000}"
-        self.printer.mark_item_done(item_id)
+        item_id = self._tool_call_ids.pop(id(tool_input), None)
+        if item_id is not None:
+            await self.printer.post("mark_item_done", item_id)
         
         # Special handling for specific tools
         if tool_name == "download_video" and isinstance(tool_output, dict) and tool_output.get("status") == "success":
-            self.printer.complete_download(tool_output.get("video_path", "unknown"))
+            await self.printer.post("complete_download", tool_output.get("video_path", "unknown"))
             
         if tool_name == "search_youtube_videos" and isinstance(tool_output, list) and len(tool_output) > 0:
-            self.printer.update_item(
+            await self.printer.post(
+                "update_item",
                 f"{agent.name}_search_results",
                 f"🔍 Found {len(tool_output)} videos",
                 is_done=True,
@@ -82,14 +95,16 @@ class AgentPrinterHooks(RunHooks):
             
     async def on_handoff_begin(self, agent: Agent, context: RunContextWrapper, target_agent: Agent) -> None:
         """Called when a handoff begins"""
-        self.printer.add_agent_message(
+        await self.printer.post(
+            "add_agent_message",
             agent.name, 
             f"Handing off to {target_agent.name}"
         )
         
     async def on_handoff_end(self, agent: Agent, context: RunContextWrapper, target_agent: Agent) -> None:
         """Called when a handoff ends"""
-        self.printer.add_agent_message(
+        await self.printer.post(
+            "add_agent_message",
             target_agent.name, 
             f"Received handoff from {agent.name}"
         )
@@ -100,7 +115,7 @@ class AgentPrinterHooks(RunHooks):
             content = message["content"]
             if len(content) > 100:
                 content = content[:97] + "..."
-            self.printer.add_agent_message(agent.name, f"Said: {content}")
+            await self.printer.post("add_agent_message", agent.name, f"Said: {content}")
 
 
 def setup_printer() -> tuple[VideoPrinter, Callable]:
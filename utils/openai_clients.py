@@ -0,0 +1,17 @@
+"""
+Shared OpenAI client, created on first use so every caller reuses one
+connection pool instead of opening new connections per request.
+"""
+import os
+import functools
+from openai import AsyncOpenAI
+
+@functools.lru_cache(maxsize=1)
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Get the shared asynchronous OpenAI client.
+    
+    Returns:
+        AsyncOpenAI client configured from OPENAI_API_KEY
+    """
+    return AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=2)
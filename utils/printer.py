@@ -1,5 +1,7 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 import time
+import asyncio
+import threading
 from rich.console import Console, Group
 from rich.live import Live
 from rich.spinner import Spinner
@@ -8,6 +10,25 @@ from rich.text import Text
 from rich.progress import Progress, TaskID
 from rich.table import Table
 
+# Agent panels are shown right after the system panel, in this order
+_AGENT_CATEGORIES = (
+    "manager_agent", "searcher_agent", "transcriber_agent",
+    "segmenter_agent", "summarizer_agent", "editor_agent"
+)
+
+_AGENT_PREFIX = {
+    "Manager Agent": "🧠",
+    "Searcher Agent": "🔍",
+    "Transcriber Agent": "🎤",
+    "Segmenter Agent": "✂️",
+    "Summarizer Agent": "📝",
+    "Editor Agent": "🎞️"
+}
+
+# Posted events are applied in batches of at most this many, then the printer waits one refresh
+_MAX_EVENT_BATCH = 64
+_EVENT_DRAIN_INTERVAL = 0.25
+
 class VideoPrinter:
     """
     A printer for displaying real-time progress of the VideoAgent system.
@@ -22,18 +43,43 @@ class VideoPrinter:
             console: Optional Console instance. If not provided, a new one will be created.
         """
         self.console = console or Console()
-        self.live = Live(console=self.console, refresh_per_second=4)
-        self.items: Dict[str, tuple[str, bool, str]] = {}  # id -> (content, is_done, category)
+        # Live pulls the display on each refresh; flush() only marks it stale
+        self.live = Live(console=self.console, refresh_per_second=4, get_renderable=self._get_renderable)
+        self._dirty = True
+        self._renderable: Group = Group()
+        # Live rebuilds the display on its own thread; item state is only touched while holding this lock
+        self._lock = threading.RLock()
+        # Item fields are kept in parallel dicts keyed by id, with an index of ids per category
+        # (a dict used as an ordered set, so items keep the order they were added in)
+        self._content: Dict[str, str] = {}
+        self._done: Dict[str, bool] = {}
+        self._category: Dict[str, str] = {}
+        self._by_category: Dict[str, Dict[str, None]] = {}
+        # Panels are cached per category and only rebuilt when one of their items changed
+        self._panels_cache: Dict[str, Panel] = {}
+        self._dirty_categories: set[str] = set()
+        self._agent_categories: Dict[str, str] = {}  # agent name -> category
+        # Spinners of running items are reused across rebuilds so they keep their animation state
+        self._spinner_pool: Dict[str, Tuple[str, Spinner]] = {}  # id -> (content, spinner)
         self.hide_done_ids: set[str] = set()
         self.progress = Progress()
         self.progress_tasks: Dict[str, TaskID] = {}
         self.download_progress: Optional[TaskID] = None
         self.start_time = time.time()
+        # Events posted from agent hooks; only used when started inside an event loop
+        self._event_q: Optional[asyncio.Queue] = None
+        self._drain_task: Optional[asyncio.Task] = None
         
     def start(self) -> None:
         """Start the live display"""
         self.live.start()
         self.update_item("system", "🎬 Video Agent System Initialized", category="system")
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._event_q = asyncio.Queue()
+        self._drain_task = asyncio.create_task(self._drain())
         
     def end(self) -> None:
         """Stop the live display and show final summary"""
@@ -44,12 +90,61 @@ class VideoPrinter:
             is_done=True,
             category="system"
         )
+        if self._drain_task is not None:
+            self._drain_task.cancel()
+            self._drain_task = None
+            self._apply_pending_events()
         self.flush()
         self.live.stop()
         
+    async def post(self, method: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Queue a printer call to be applied by the drain task.
+        
+        Args:
+            method: Name of the printer method to call, e.g. "update_item"
+            *args: Positional arguments for the method
+            **kwargs: Keyword arguments for the method
+        """
+        if self._event_q is None:
+            getattr(self, method)(*args, **kwargs)
+            return
+        await self._event_q.put((method, args, kwargs))
+        
+    def _apply_pending_events(self, limit: Optional[int] = None) -> int:
+        """Apply queued events without waiting, returning how many were applied"""
+        applied = 0
+        while limit is None or applied < limit:
+            try:
+                method, args, kwargs = self._event_q.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            try:
+                getattr(self, method)(*args, **kwargs)
+            except Exception as e:
+                print(f"Printer: failed to apply {method}: {e}")
+            applied += 1
+        return applied
+        
+    async def _drain(self) -> None:
+        """Apply posted events in batches, marking the display stale once per batch"""
+        while True:
+            method, args, kwargs = await self._event_q.get()
+            try:
+                getattr(self, method)(*args, **kwargs)
+            except Exception as e:
+                print(f"Printer: failed to apply {method}: {e}")
+            self._apply_pending_events(_MAX_EVENT_BATCH - 1)
+            self.flush()
+            await asyncio.sleep(_EVENT_DRAIN_INTERVAL)
+        
     def hide_done_checkmark(self, item_id: str) -> None:
         """Hide the checkmark for a completed item"""
-        self.hide_done_ids.add(item_id)
+        with self._lock:
+            self.hide_done_ids.add(item_id)
+            if item_id in self._category:
+                self._dirty_categories.add(self._category[item_id])
+        self.flush()
         
     def update_item(
         self, 
@@ -69,17 +164,32 @@ class VideoPrinter:
             hide_checkmark: Whether to hide the checkmark when done
             category: Category of the item (system, search, download, transcribe, etc.)
         """
-        self.items[item_id] = (content, is_done, category)
-        if hide_checkmark:
-            self.hide_done_ids.add(item_id)
+        with self._lock:
+            self._content[item_id] = content
+            self._done[item_id] = is_done
+            previous = self._category.get(item_id)
+            if previous != category:
+                if previous is not None:
+                    del self._by_category[previous][item_id]
+                    self._dirty_categories.add(previous)
+                self._category[item_id] = category
+                self._by_category.setdefault(category, {})[item_id] = None
+            self._dirty_categories.add(category)
+            if is_done:
+                self._spinner_pool.pop(item_id, None)
+            if hide_checkmark:
+                self.hide_done_ids.add(item_id)
         self.flush()
         
     def mark_item_done(self, item_id: str) -> None:
         """Mark an item as completed"""
-        if item_id in self.items:
-            content, _, category = self.items[item_id]
-            self.items[item_id] = (content, True, category)
-            self.flush()
+        with self._lock:
+            if item_id not in self._category:
+                return
+            self._done[item_id] = True
+            self._spinner_pool.pop(item_id, None)
+            self._dirty_categories.add(self._category[item_id])
+        self.flush()
             
     def add_progress_task(self, task_id: str, description: str, total: float = 100.0) -> None:
         """
@@ -94,6 +204,19 @@ class VideoPrinter:
         self.progress_tasks[task_id] = task
         self.flush()
         
+    def remove_progress_task(self, task_id: str) -> None:
+        """
+        Stop a progress bar task and remove it from the display.
+        
+        Args:
+            task_id: Identifier of the task to remove
+        """
+        task = self.progress_tasks.pop(task_id, None)
+        if task is not None:
+            self.progress.stop_task(task)
+            self.progress.remove_task(task)
+            self.flush()
+            
     def update_progress(self, task_id: str, advance: float = 1.0, description: Optional[str] = None) -> None:
         """
         Update a progress bar task.
@@ -128,14 +251,25 @@ class VideoPrinter:
             self.progress.update(self.download_progress, advance=advance)
             self.flush()
             
-    def complete_download(self, video_path: str) -> None:
-        """Mark a download as complete"""
+    def complete_download(self, video_path: Optional[str]) -> None:
+        """Mark a download as complete, or as failed if video_path is None"""
         if self.download_progress is not None:
-            self.progress.update(self.download_progress, completed=True)
-            self.update_item("download", f"✅ Download complete: {video_path}", is_done=True, category="download")
+            # The finished bar is dropped so the progress display only holds active tasks
+            self.progress.remove_task(self.download_progress)
+            if video_path is None:
+                self.update_item("download", "❌ Download failed", is_done=True, hide_checkmark=True, category="download")
+            else:
+                self.update_item("download", f"✅ Download complete: {video_path}", is_done=True, category="download")
             self.download_progress = None
             self.flush()
     
+    def category_for(self, agent_name: str) -> str:
+        """Return the display category of an agent, computing it once per agent name"""
+        category = self._agent_categories.get(agent_name)
+        if category is None:
+            category = self._agent_categories[agent_name] = agent_name.lower().replace(" ", "_")
+        return category
+    
     def add_agent_message(self, agent_name: str, message: str) -> None:
         """
         Add a message from an agent.
@@ -145,79 +279,76 @@ class VideoPrinter:
             message: The message content
         """
         item_id = f"{agent_name}_{int(time.time() * 1000)}"
-        prefix = {
-            "Manager Agent": "🧠",
-            "Searcher Agent": "🔍",
-            "Transcriber Agent": "🎤",
-            "Segmenter Agent": "✂️",
-            "Summarizer Agent": "📝",
-            "Editor Agent": "🎞️"
-        }.get(agent_name, "🤖")
+        prefix = _AGENT_PREFIX.get(agent_name, "🤖")
         
         self.update_item(
             item_id,
             f"{prefix} {agent_name}: {message}",
-            category=agent_name.lower().replace(" ", "_")
+            category=self.category_for(agent_name)
         )
     
     def flush(self) -> None:
-        """Update the display with current items"""
-        # Group items by category
-        categories = {}
-        for item_id, (content, is_done, category) in self.items.items():
-            if category not in categories:
-                categories[category] = []
+        """Mark the display as stale; it is rebuilt at most once per Live refresh"""
+        self._dirty = True
+        
+    def _get_renderable(self) -> Group:
+        """Return the current display, rebuilding it only if something changed since the last refresh"""
+        if self._dirty:
+            # Clear first so changes made while building mark the display stale again
+            self._dirty = False
+            with self._lock:
+                self._renderable = self._build_renderable()
+        return self._renderable
+        
+    def _get_spinner(self, item_id: str, content: str) -> Spinner:
+        """Return the pooled spinner for a running item, creating it or updating its text as needed"""
+        pooled = self._spinner_pool.get(item_id)
+        if pooled is None:
+            spinner = Spinner("dots", text=content)
+            self._spinner_pool[item_id] = (content, spinner)
+            return spinner
+        
+        pooled_content, spinner = pooled
+        if pooled_content != content:
+            spinner.update(text=content)
+            self._spinner_pool[item_id] = (content, spinner)
+        return spinner
+        
+    def _build_renderable(self) -> Group:
+        """Rebuild the panels of changed categories and assemble the display from the cached panels; call with the lock held"""
+        dirty_categories, self._dirty_categories = self._dirty_categories, set()
+        for category in dirty_categories:
+            item_ids = self._by_category.get(category, ())
+            if not item_ids:
+                self._panels_cache.pop(category, None)
+                continue
                 
-            if is_done:
-                prefix = "✅ " if item_id not in self.hide_done_ids else ""
-                categories[category].append(prefix + content)
-            else:
-                categories[category].append(Spinner("dots", text=content))
-        
-        # Create panels for each category
-        panels = []
-        
-        # System panel always first
-        if "system" in categories:
-            system_panel = Panel(
-                Group(*categories["system"]),
-                title="System",
-                border_style="bright_blue"
-            )
-            panels.append(system_panel)
+            content, done = self._content, self._done
+            lines = []
+            for item_id in item_ids:
+                if done[item_id]:
+                    prefix = "✅ " if item_id not in self.hide_done_ids else ""
+                    lines.append(prefix + content[item_id])
+                else:
+                    lines.append(self._get_spinner(item_id, content[item_id]))
             
-        # Agent panels
-        agent_categories = [
-            "manager_agent", "searcher_agent", "transcriber_agent", 
-            "segmenter_agent", "summarizer_agent", "editor_agent"
-        ]
-        
-        for category in agent_categories:
-            if category in categories and categories[category]:
-                title = " ".join(word.capitalize() for word in category.split("_"))
-                panels.append(
-                    Panel(
-                        Group(*categories[category]),
-                        title=title,
-                        border_style="green"
-                    )
-                )
-        
-        # Other categories
-        for category, items in categories.items():
-            if category != "system" and category not in agent_categories and items:
+            panel = self._panels_cache.get(category)
+            if panel is not None:
+                panel.renderable = Group(*lines)
+            elif category == "system":
+                self._panels_cache[category] = Panel(Group(*lines), title="System", border_style="bright_blue")
+            else:
                 title = " ".join(word.capitalize() for word in category.split("_"))
-                panels.append(
-                    Panel(
-                        Group(*items),
-                        title=title,
-                        border_style="yellow"
-                    )
-                )
+                border_style = "green" if category in _AGENT_CATEGORIES else "yellow"
+                self._panels_cache[category] = Panel(Group(*lines), title=title, border_style=border_style)
+        
+        # System panel first, then agent panels, then other categories in the order they appeared
+        order = ["system", *_AGENT_CATEGORIES]
+        order.extend(c for c in list(self._by_category) if c != "system" and c not in _AGENT_CATEGORIES)
+        panels = [self._panels_cache[c] for c in order if c in self._panels_cache]
         
         # Add progress bars if any
         if self.progress_tasks or self.download_progress is not None:
             panels.append(self.progress)
             
-        # Update the live display
-        self.live.update(Group(*panels)) 
\ No newline at end of file
+        return Group(*panels) 
\ No newline at end of file